@@ -1,2 +1,25 @@
-from .gr_field import GraphicField, GraphicObject, GraphicZone
-from .paint_ext import QPainter_ext
+from importlib import import_module
+
+# Die Klassen werden erst beim ersten Zugriff importiert, damit "import graphic_ext" schnell bleibt
+# und z.B. QPainter_ext ohne QtWidgets/numpy benutzt werden kann.
+_LAZY_ATTRIBUTES = {
+    'GraphicField': 'graphic_ext.gr_field',
+    'GraphicObject': 'graphic_ext.gr_field',
+    'GraphicZone': 'graphic_ext.gr_field',
+    'GraphicScene': 'graphic_ext.gr_field',
+    'QPainter_ext': 'graphic_ext.paint_ext',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from array import array
+from functools import lru_cache
+from typing import Optional, List, Tuple, TYPE_CHECKING
+
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtGui import QOpenGLContext, QImage, QColor
+
+if TYPE_CHECKING:
+    from graphic_ext.gr_field import GraphicField
+
+VERTEX_SHADER = """
+attribute vec2 a_position;  // Einheitsquadrat (0..1, 0..1)
+uniform vec4 u_rect;        // Rechteck in normierte Einheiten: x, y, Breite, Höhe
+uniform vec4 u_view;        // normierte Einheiten -> NDC: scale_x, scale_y, offset_x, offset_y
+varying vec2 v_tex;
+
+void main() {
+    vec2 norm = u_rect.xy + a_position * u_rect.zw;
+    gl_Position = vec4(norm * u_view.xy + u_view.zw, 0.0, 1.0);
+    v_tex = a_position;
+}
+"""
+
+FRAGMENT_SHADER = """
+#ifdef GL_ES
+precision mediump float;
+#endif
+uniform sampler2D u_texture;
+uniform vec4 u_color;
+uniform float u_use_texture;
+varying vec2 v_tex;
+
+void main() {
+    gl_FragColor = mix(u_color, texture2D(u_texture, v_tex), u_use_texture);
+}
+"""
+
+UNIT_QUAD = (0., 0., 1., 0., 0., 1., 1., 1.)
+
+
+def opengl_is_available() -> bool:
+    """Prüft, ob PyOpenGL und QtOpenGL importiert und ein OpenGL Kontext erzeugt werden können."""
+
+    try:
+        import OpenGL.GL  # noqa: F401
+        from PyQt6 import QtOpenGL, QtOpenGLWidgets  # noqa: F401
+    except ImportError:
+        return False
+    return QOpenGLContext().create()
+
+
+def view_uniform(gr_field: GraphicField, width: int, height: int) -> Tuple[float, float, float, float]:
+    """u_view für ein Bild mit width x height Pixel: normierte Einheiten -> NDC."""
+
+    s = gr_field.norm_to_pixel_rel(1)
+    width, height = max(width, 1), max(height, 1)
+    return (2*s/width, -2*s/height,
+            2*s*(gr_field.margin - gr_field.zoom_x)/width - 1,
+            1 - 2*s*(gr_field.margin - gr_field.zoom_y)/height)
+
+
+def background_rects(gr_field: GraphicField) -> List[Tuple[Tuple[float, float, float, float], Optional[QColor]]]:
+    """Rechtecke (x, y, Breite, Höhe) in normierte Einheiten in Zeichenreihenfolge, Farbe None: Hintergrundbild."""
+
+    margin = gr_field.margin
+    # Probe (wie in GraphicField.paintEvent)
+    sample = (-margin, -margin, gr_field.x_range + 2*margin, gr_field.x_range + 2*margin)
+    rects = [(sample, QColor(Qt.GlobalColor.white))]
+    pixmap = gr_field.scene.background_pixmap
+    if pixmap is not None and not pixmap.isNull():
+        rects.append(((0, 0, gr_field.x_range, gr_field.y_range), None))
+    return rects
+
+
+def create_gl_background(gr_field: GraphicField) -> Optional[GLBackground]:
+    """Erzeugt die OpenGL Hintergrundebene für gr_field oder gibt None zurück, wenn OpenGL fehlt."""
+
+    if not opengl_is_available():
+        return None
+    return _gl_background_class()(gr_field)
+
+
+@lru_cache(maxsize=None)
+def _gl_background_class():
+
+    from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+    from PyQt6.QtOpenGL import QOpenGLShaderProgram, QOpenGLShader, QOpenGLBuffer, QOpenGLTexture, \
+        QOpenGLVertexArrayObject
+    from OpenGL import GL
+
+    class _GLBackground(QOpenGLWidget):
+        """Zeichnet Rahmen, Probe und Hintergrundbild eines GraphicField mit OpenGL.
+
+        Das Bild wird einmal als Textur hochgeladen, Verschiebung und Zoom werden als Uniform übergeben.
+        Objekte und FrontLayer bleiben normale Widgets über dieser Ebene.
+        """
+
+        failed = pyqtSignal()
+
+        def __init__(self, gr_field: GraphicField):
+            super().__init__(gr_field)
+            self.gr_field = gr_field
+            self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+
+            self.__program: Optional[QOpenGLShaderProgram] = None
+            self.__vao: Optional[QOpenGLVertexArrayObject] = None
+            self.__quad: Optional[QOpenGLBuffer] = None
+            self.__texture: Optional[QOpenGLTexture] = None
+            self.__texture_dirty = True
+
+            self.gr_field.zoomed.connect(self.update)
+            self.gr_field.scene.background_changed.connect(self.set_texture_dirty)
+
+        def set_texture_dirty(self):
+
+            self.__texture_dirty = True
+            self.update()
+
+        def initializeGL(self) -> None:
+
+            program = QOpenGLShaderProgram(self)
+            if not (program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Vertex, VERTEX_SHADER) and
+                    program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Fragment, FRAGMENT_SHADER) and
+                    program.link()):
+                # zurück zum QPainter Weg, aber nicht während des OpenGL Aufrufs
+                QTimer.singleShot(0, self.failed.emit)
+                return
+            self.__program = program
+
+            self.__vao = QOpenGLVertexArrayObject(self)
+            self.__vao.create()
+            self.__vao.bind()
+
+            self.__quad = QOpenGLBuffer(QOpenGLBuffer.Type.VertexBuffer)
+            self.__quad.create()
+            self.__quad.bind()
+            data = array('f', UNIT_QUAD).tobytes()
+            self.__quad.allocate(data, len(data))
+
+            program.bind()
+            program.enableAttributeArray('a_position')
+            program.setAttributeBuffer('a_position', GL.GL_FLOAT, 0, 2)
+            program.setUniformValue('u_texture', 0)
+            program.release()
+
+            self.__vao.release()
+            self.__quad.release()
+            self.__texture_dirty = True
+
+        def __upload_texture(self):
+
+            if self.__texture is not None:
+                self.__texture.destroy()
+                self.__texture = None
+            pixmap = self.gr_field.scene.background_pixmap
+            if pixmap is not None and not pixmap.isNull():
+                image = pixmap.toImage().convertToFormat(QImage.Format.Format_RGBA8888)
+                self.__texture = QOpenGLTexture(image, QOpenGLTexture.MipMapGeneration.GenerateMipMaps)
+                self.__texture.setMinificationFilter(QOpenGLTexture.Filter.LinearMipMapLinear)
+                self.__texture.setMagnificationFilter(QOpenGLTexture.Filter.Linear)
+            self.__texture_dirty = False
+
+        def __draw_rect(self, x: float, y: float, width: float, height: float,
+                        color: Optional[QColor] = None):
+
+            self.__program.setUniformValue('u_rect', x, y, width, height)
+            if color is None:
+                self.__program.setUniformValue('u_use_texture', 1.)
+            else:
+                self.__program.setUniformValue('u_use_texture', 0.)
+                self.__program.setUniformValue('u_color', color.redF(), color.greenF(), color.blueF(), color.alphaF())
+            GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, 0, 4)
+
+        def paintGL(self) -> None:
+
+            gray = QColor(Qt.GlobalColor.gray)
+            GL.glClearColor(gray.redF(), gray.greenF(), gray.blueF(), 1.)
+            GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+            if self.__program is None:
+                return
+            if self.__texture_dirty:
+                self.__upload_texture()
+
+            self.__program.bind()
+            self.__vao.bind()
+            self.__program.setUniformValue('u_view', *view_uniform(self.gr_field, self.width(), self.height()))
+
+            for rect, color in background_rects(self.gr_field):
+                if color is not None:
+                    self.__draw_rect(*rect, color)
+                elif self.__texture is not None:
+                    self.__texture.bind(0)
+                    self.__draw_rect(*rect)
+                    self.__texture.release(0)
+
+            self.__vao.release()
+            self.__program.release()
+
+    return _GLBackground
+
+
+def __getattr__(name: str):
+    # die Klasse wird erst definiert, wenn sie gebraucht wird, damit QtOpenGL und PyOpenGL optional bleiben
+    if name == 'GLBackground':
+        return _gl_background_class()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,30 +1,210 @@
+from __future__ import annotations
+
+import math
+import weakref
 from cmath import rect, pi
-from typing import List, Any, Callable, Optional, Dict, Tuple, Iterable
+from collections import OrderedDict
+from typing import List, Any, Callable, Optional, Dict, Tuple, Iterable, NamedTuple, TYPE_CHECKING
 
-import PIL
-import numpy as np
 from PyQt6 import QtGui
-from PyQt6.QtCore import Qt, pyqtSignal, QObject, QRect
-from PyQt6.QtGui import QPainter, QPen, QPixmap, QColor, QFont
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QRect, QRectF, QSize, QTimer, QEvent
+from PyQt6.QtGui import QPainter, QPen, QPixmap, QColor, QFont, QImage
 from PyQt6.QtWidgets import QFrame, QLabel
 from PyQt6.QtWidgets import QSizePolicy
-from PIL import Image
-from nptyping import NDArray, Bool, Shape
 
 from graphic_ext.paint_ext import QPainter_ext
-from graphic_ext.helper_functions import set_attributes, complex_to_tuple_rounded
+from graphic_ext.helper_functions import set_attributes, complex_to_tuple_rounded, lazy_import
+
+if TYPE_CHECKING:
+    from nptyping import NDArray, Bool, Shape
+
+# numpy und PIL werden erst bei der ersten Benutzung geladen
+np = lazy_import('numpy')
+
+
+class ZoomState(NamedTuple):
+    """Zoom Zustand eines GraphicField (in normierte Einheiten)."""
+
+    zoom_x: float
+    zoom_y: float
+    zoom_w: float
+
+
+class ZoomHistory:
+    """Verlauf der Zoom Zustände mit Zurück/Vorwärts, Lesezeichen und einem LRU-Cache gerenderter Bilder.
+
+    Der Cache ist durch max_cache_bytes begrenzt, max_cache_bytes = 0 schaltet das Speichern der Bilder aus.
+    """
+
+    def __init__(self, max_length: int = 100, max_cache_bytes: int = 64 * 2**20):
+
+        self.max_length = max_length
+        self.max_cache_bytes = max_cache_bytes
+
+        self.states: List[ZoomState] = []
+        self.index = -1
+        self.bookmarks: Dict[str, ZoomState] = {}
+
+        self.__frames: OrderedDict[Tuple[ZoomState, Tuple[int, int]], QPixmap] = OrderedDict()
+        self.__cache_bytes = 0
+
+    def current(self) -> Optional[ZoomState]:
+
+        if self.index < 0:
+            return None
+        return self.states[self.index]
+
+    def push(self, state: ZoomState):
+        """Fügt einen neuen Zustand hinter dem aktuellen ein und verwirft die Vorwärts-Einträge."""
+
+        if state == self.current():
+            return
+        del self.states[self.index + 1:]
+        self.states.append(state)
+        if len(self.states) > self.max_length:
+            del self.states[0]
+        self.index = len(self.states) - 1
+
+    def can_go_back(self) -> bool:
+        return self.index > 0
+
+    def can_go_forward(self) -> bool:
+        return self.index < len(self.states) - 1
+
+    def back(self) -> Optional[ZoomState]:
+
+        if not self.can_go_back():
+            return None
+        self.index -= 1
+        return self.states[self.index]
+
+    def forward(self) -> Optional[ZoomState]:
+
+        if not self.can_go_forward():
+            return None
+        self.index += 1
+        return self.states[self.index]
+
+    def clear(self):
+
+        self.states = []
+        self.index = -1
+        self.clear_frames()
+
+    @staticmethod
+    def __frame_bytes(frame: QPixmap) -> int:
+        return frame.width() * frame.height() * max(frame.depth(), 8) // 8
+
+    def store_frame(self, state: ZoomState, size: QSize, frame: QPixmap):
+
+        frame_bytes = self.__frame_bytes(frame)
+        if frame_bytes > self.max_cache_bytes:
+            return
+        key = (state, (size.width(), size.height()))
+        if key in self.__frames:
+            self.__cache_bytes -= self.__frame_bytes(self.__frames.pop(key))
+        self.__frames[key] = frame
+        self.__cache_bytes += frame_bytes
+        while self.__cache_bytes > self.max_cache_bytes:
+            _, old_frame = self.__frames.popitem(last=False)
+            self.__cache_bytes -= self.__frame_bytes(old_frame)
+
+    def frame(self, state: ZoomState, size: QSize) -> Optional[QPixmap]:
+
+        key = (state, (size.width(), size.height()))
+        frame = self.__frames.get(key)
+        if frame is not None:
+            self.__frames.move_to_end(key)
+        return frame
+
+    def clear_frames(self):
+
+        self.__frames.clear()
+        self.__cache_bytes = 0
+
+    def cache_bytes(self) -> int:
+        return self.__cache_bytes
+
+
+class GraphicScene(QObject):
+    """Daten einer Szene (Bereiche, Hintergrund, Zonen), die von mehreren GraphicField geteilt werden können.
+
+    Jedes GraphicField hat seinen eigenen Zoom und seine eigenen Caches. Das Hintergrundbild wird als
+    QPixmap implizit geteilt und daher nicht für jede Ansicht kopiert.
+    """
+
+    background_changed = pyqtSignal()
+    ranges_changed = pyqtSignal()
+
+    def __init__(self, x_range: float = 1000, y_range: float = 1000):
+        super().__init__()
+
+        self.__x_range = x_range
+        self.__y_range = y_range
+
+        self.background_pixmap: Optional[QPixmap] = None
+        self.background_file: Optional[str] = None
+        self.zones: List[GraphicZone] = []
+        self.views: weakref.WeakSet[GraphicField] = weakref.WeakSet()
+
+    @property
+    def x_range(self) -> float:
+        return self.__x_range
+
+    @x_range.setter
+    def x_range(self, value: float):
+        self.set_ranges(value, self.__y_range)
+
+    @property
+    def y_range(self) -> float:
+        return self.__y_range
+
+    @y_range.setter
+    def y_range(self, value: float):
+        self.set_ranges(self.__x_range, value)
+
+    def set_ranges(self, x_range: float, y_range: float):
+        """Setzt beide Bereiche auf einmal und benachrichtigt alle Ansichten."""
+
+        if (x_range, y_range) != (self.__x_range, self.__y_range):
+            self.__x_range = x_range
+            self.__y_range = y_range
+            self.ranges_changed.emit()
+
+    def set_background(self, pixmap: QPixmap, use_picture_coordinates: bool = True):
+
+        if use_picture_coordinates:
+            self.set_ranges(pixmap.width(), pixmap.height())
+        self.background_pixmap = pixmap
+        self.background_file = None
+        self.background_changed.emit()
+
+    def set_background_from_file(self, file_path: str, use_picture_coordinates: bool = True):
+
+        self.set_background(QPixmap(file_path), use_picture_coordinates)
+        self.background_file = file_path
 
 
 class GraphicField(QFrame):
     zoomed = pyqtSignal()
+    region_selected = pyqtSignal(list)  # Liste von ZoneOverlap für das im Mode 'region_select' gezogene Rechteck
+    # Zonen-Ereignisse in dieser Ansicht (die Signale der Zone selbst gelten für alle Ansichten der Szene)
+    zone_clicked = pyqtSignal(object)
+    zone_double_clicked = pyqtSignal(object)
+    zone_entered = pyqtSignal(object)
+    zone_left = pyqtSignal(object)
 
     def __init__(self, parent=None, x_range: float = 1000, y_range: float = 1000, margin: float = 0,
-                 keep_ratio: bool = True, scale: bool = True):
+                 keep_ratio: bool = True, scale: bool = True, scene: Optional[GraphicScene] = None,
+                 use_opengl: bool = False):
         super().__init__(parent)
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
 
-        self.x_range = x_range
-        self.y_range = y_range
+        # x_range, y_range, Zonen und Hintergrund gehören der (eventuell geteilten) Szene
+        if scene is None:
+            scene = GraphicScene(x_range, y_range)
+        self.scene = scene
+        x_range = scene.x_range
         self.margin = margin
         self.pixel_range0 = self.width()
 
@@ -36,11 +216,11 @@ class GraphicField(QFrame):
         # Mode einstellen ('navig', 'move' oder 'select')
         self.keep_ratio = keep_ratio
         self.scale = scale
-        self.modes = ['normal', 'grab', 'select']
+        self.modes = ['normal', 'grab', 'select', 'region_select']
         self.__mode = 'normal'
 
         self.objects: List[GraphicObject] = []
-        self.zones: List[GraphicZone] = []
+        self.hovered_zones: set = set()  # Zonen unter der Maus in dieser Ansicht
 
         self.__select = False
         self.select_start = (0, 0)
@@ -52,35 +232,291 @@ class GraphicField(QFrame):
 
         self.__mouse_is_pressed = False
 
+        self.zoom_history = ZoomHistory()
+
         self.zoomed.connect(self.update)
 
         self.background = BackgroundPicture(self)
         self.front_layer = FrontLayer(self)
 
+        # zeigt ein gespeichertes Bild sofort an, bis die Ansicht neu gerendert ist
+        self.__cached_frame = QLabel(self)
+        self.__cached_frame.hide()
+        self.frame_refine_delay = 100  # ms, nach denen das gespeicherte Bild durch das gerenderte ersetzt wird
+        self.__refine_timer = QTimer(self)
+        self.__refine_timer.setSingleShot(True)
+        self.__refine_timer.timeout.connect(self.__refine_frame)
+        self.zoomed.connect(self.__hide_cached_frame)
+
+        self.__ranges = (self.x_range, self.y_range)
+        self.__keep_zoom = False
+        self.scene.views.add(self)
+        self.scene.ranges_changed.connect(self.__scene_ranges_changed)
+        self.scene.background_changed.connect(self.__scene_background_changed)
+        if self.scene.background_pixmap is not None:
+            self.background.set_picture(self.scene.background_pixmap)
+
+        # OpenGL Hintergrundebene (None, wenn der QPainter Weg benutzt wird)
+        self.gl_background = None
+        if use_opengl:
+            self.enable_opengl()
+
+    def enable_opengl(self) -> bool:
+        """Zeichnet Rahmen und Hintergrund mit OpenGL. Gibt False zurück, wenn OpenGL nicht verfügbar ist."""
+
+        if self.gl_background is not None:
+            return True
+
+        from graphic_ext.gl_backend import create_gl_background
+
+        self.gl_background = create_gl_background(self)
+        if self.gl_background is None:
+            return False
+        self.gl_background.failed.connect(self.disable_opengl)
+        self.gl_background.setGeometry(0, 0, self.width(), self.height())
+        self.gl_background.lower()
+        self.gl_background.show()
+        self.background.hide()
+        self.update()
+        return True
+
+    def disable_opengl(self):
+        """Kehrt zum QPainter Weg zurück."""
+
+        if self.gl_background is None:
+            return
+        self.gl_background.hide()
+        self.gl_background.deleteLater()
+        self.gl_background = None
+        self.background.show()
+        self.background.lower()
+        self.update()
+
+    @property
+    def x_range(self) -> float:
+        return self.scene.x_range
+
+    @x_range.setter
+    def x_range(self, value: float):
+        self.scene.x_range = value
+
+    @property
+    def y_range(self) -> float:
+        return self.scene.y_range
+
+    @y_range.setter
+    def y_range(self, value: float):
+        self.scene.y_range = value
+
+    @property
+    def zones(self) -> List[GraphicZone]:
+        return self.scene.zones
+
+    @zones.setter
+    def zones(self, value: List[GraphicZone]):
+        self.scene.zones = value
+
+    @property
+    def background_file(self) -> Optional[str]:
+        return self.scene.background_file
+
     def mouse_is_pressed(self):
 
         return self.__mouse_is_pressed
 
     def set_background(self, pixmap: QPixmap, use_picture_coordinates: bool = True, keep_zoom: bool = False):
 
-        if use_picture_coordinates:
-            self.x_range = pixmap.width()
-            self.y_range = pixmap.height()
-            if not keep_zoom:
-                self.zoom_reset()
-        self.background.set_picture(pixmap)
+        self.__keep_zoom = keep_zoom
+        self.scene.set_background(pixmap, use_picture_coordinates)
+        self.__keep_zoom = False
+        if use_picture_coordinates and not keep_zoom and self.zoom_state() != (0, 0, self.x_range):
+            self.zoom_reset()
 
     def set_background_from_file(self, file_path: str, use_picture_coordinates: bool = True):
 
         pixmap = QPixmap(file_path)
         self.set_background(pixmap, use_picture_coordinates)
+        self.scene.background_file = file_path
+
+    def __scene_background_changed(self):
+
+        self.background.set_picture(self.scene.background_pixmap)
+        self.zoom_history.clear_frames()
+        self.background.refresh()
+
+    def __scene_ranges_changed(self):
+
+        self.zoom_history.clear_frames()
+        if self.__ranges != (self.x_range, self.y_range):
+            # die alten Zustände beziehen sich auf die alten Bereiche
+            self.zoom_history.clear()
+            if not self.__keep_zoom:
+                self.zoom_x = 0
+                self.zoom_y = 0
+                self.zoom_w = self.x_range
+                self.zoomed.emit()
+            self.zoom_history.push(self.zoom_state())
+        self.__ranges = (self.x_range, self.y_range)
+        self.background.refresh()
+        self.update()
+
+    def update_hovered_zones(self, x: float, y: float):
+        """Aktualisiert die Zonen unter der Maus (x, y in normierte Einheiten) für diese Ansicht."""
+
+        for zone in self.zones:
+            if zone.coordinates_are_in_zone(x, y):
+                if zone not in self.hovered_zones:
+                    self.__set_zone_hovered(zone, True)
+            elif zone in self.hovered_zones:
+                self.__set_zone_hovered(zone, False)
+
+    def clear_hovered_zones(self):
+
+        for zone in list(self.hovered_zones):
+            self.__set_zone_hovered(zone, False)
+
+    def __set_zone_hovered(self, zone: GraphicZone, hovered: bool):
+
+        if hovered:
+            self.hovered_zones.add(zone)
+            self.zone_entered.emit(zone)
+        else:
+            self.hovered_zones.discard(zone)
+            self.zone_left.emit(zone)
+
+        # zone.activated: die Maus ist in irgendeiner Ansicht der Szene über der Zone
+        activated = any(zone in view.hovered_zones for view in self.scene.views)
+        if activated != zone.activated:
+            zone.activated = activated
+            if activated:
+                zone.mouse_enter.emit()
+            else:
+                zone.mouse_leave.emit()
+
+    def visible_area(self) -> Tuple[float, float, float, float]:
+        """Gibt den sichtbaren Bereich (x, y, Breite, Höhe) in normierte Einheiten zurück."""
+
+        x, y = self.pixel_to_norm_coord(0, 0)
+        return x, y, self.pixel_to_norm_rel(self.width()), self.pixel_to_norm_rel(self.height())
+
+    def save_scene(self, path: str, metadata: Optional[dict] = None):
+        """Speichert Bereiche, Zoom, Objektpositionen, Masken der Zonen und Hintergrund in Ordner 'path'."""
+
+        from graphic_ext.scene import save_scene
+
+        save_scene(self, path, metadata)
+
+    def load_scene(self, path: str, mmap: bool = True) -> List[GraphicZone]:
+        """Lädt eine mit save_scene gespeicherte Szene. Die Masken werden standardmäßig nur gemappt."""
+
+        from graphic_ext.scene import load_scene
+
+        return load_scene(self, path, mmap)
 
     def zoom_reset(self):
 
+        self.__leave_zoom_state()
         self.zoom_x = 0
         self.zoom_y = 0
         self.zoom_w = self.x_range
         self.zoomed.emit()
+        self.__enter_zoom_state()
+
+    def zoom_state(self) -> ZoomState:
+
+        return ZoomState(self.zoom_x, self.zoom_y, self.zoom_w)
+
+    def set_zoom(self, zoom_x: float, zoom_y: float, zoom_w: float):
+
+        self.__leave_zoom_state()
+        self.__apply_zoom_state(ZoomState(zoom_x, zoom_y, zoom_w))
+        self.__enter_zoom_state()
+
+    def __leave_zoom_state(self, store_frame: bool = False):
+        """Merkt sich den aktuellen Zustand, bevor der Zoom geändert wird.
+
+        Das Bild wird nur mit store_frame=True gespeichert (beim Verlassen über Zurück/Vorwärts/Lesezeichen),
+        da grab() die ganze Ansicht noch einmal rendert und die übrigen Zustände selten wieder besucht werden.
+        """
+
+        state = self.zoom_state()
+        self.zoom_history.push(state)
+        if store_frame:
+            self.__store_frame(state)
+
+    def __store_frame(self, state: ZoomState):
+
+        if self.zoom_history.max_cache_bytes > 0 and self.isVisible() and not self.__cached_frame.isVisible() and \
+                self.zoom_history.frame(state, self.size()) is None:
+            self.zoom_history.store_frame(state, self.size(), self.grab())
+
+    def __enter_zoom_state(self):
+
+        self.zoom_history.push(self.zoom_state())
+
+    def __apply_zoom_state(self, state: ZoomState):
+
+        frame = self.zoom_history.frame(state, self.size())
+        self.zoom_x, self.zoom_y, self.zoom_w = state
+        if frame is None:
+            self.__refine_frame()
+        else:
+            # erst das gespeicherte Bild zeigen, neu gerendert wird erst nach frame_refine_delay
+            # (bei schnellem Zurück/Vorwärts nur einmal für den letzten Zustand)
+            self.__cached_frame.setPixmap(frame)
+            self.__cached_frame.resize(frame.size())
+            self.__cached_frame.move(0, 0)
+            self.__cached_frame.show()
+            self.__cached_frame.raise_()
+            self.__refine_timer.start(self.frame_refine_delay)
+
+    def __refine_frame(self):
+
+        self.zoomed.emit()
+
+    def __hide_cached_frame(self):
+        # jedes Neurendern (auch durch zoom_in, resize usw.) ersetzt das gespeicherte Bild
+
+        self.__refine_timer.stop()
+        self.__cached_frame.hide()
+
+    def showing_cached_frame(self) -> bool:
+
+        return self.__cached_frame.isVisible()
+
+    def zoom_back(self) -> bool:
+        """Geht zum vorherigen Zoom Zustand. Gibt False zurück, wenn es keinen gibt."""
+
+        self.__leave_zoom_state(store_frame=True)
+        state = self.zoom_history.back()
+        if state is None:
+            return False
+        self.__apply_zoom_state(state)
+        return True
+
+    def zoom_forward(self) -> bool:
+        """Geht zum nächsten Zoom Zustand. Gibt False zurück, wenn es keinen gibt."""
+
+        self.__leave_zoom_state(store_frame=True)
+        state = self.zoom_history.forward()
+        if state is None:
+            return False
+        self.__apply_zoom_state(state)
+        return True
+
+    def add_zoom_bookmark(self, name: str):
+
+        state = self.zoom_state()
+        self.zoom_history.bookmarks[name] = state
+        self.__store_frame(state)
+
+    def zoom_to_bookmark(self, name: str):
+
+        if name not in self.zoom_history.bookmarks:
+            raise ValueError(f'Unbekanntes Lesezeichen: "{name}". Mögliche Variante: {list(self.zoom_history.bookmarks)}')
+        self.__leave_zoom_state(store_frame=True)
+        self.__apply_zoom_state(self.zoom_history.bookmarks[name])
+        self.__enter_zoom_state()
 
     def set_mode(self, mode: str):
 
@@ -91,7 +527,7 @@ class GraphicField(QFrame):
             self.setCursor(Qt.CursorShape.ArrowCursor)
         elif mode == 'grab':
             self.setCursor(Qt.CursorShape.OpenHandCursor)
-        elif mode == 'select':
+        elif 'select' in mode:
             self.setCursor(Qt.CursorShape.CrossCursor)
 
     def mode(self) -> str:
@@ -155,11 +591,15 @@ class GraphicField(QFrame):
 
         self.front_layer.setFixedWidth(self.width())
         self.front_layer.setFixedHeight(self.height())
+        if self.gl_background is not None:
+            self.gl_background.setGeometry(0, 0, self.width(), self.height())
         # print(a0.size())
 
     def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
 
         super().paintEvent(a0)
+        if self.gl_background is not None:
+            return
 
         qp = QPainter()
         qp.begin(self)
@@ -205,6 +645,7 @@ class GraphicField(QFrame):
             self.setCursor(Qt.CursorShape.ClosedHandCursor)
             self.__move_start = (x, y)
 
+            self.__leave_zoom_state()
             self.__zoom_x0 = self.zoom_x
             self.__zoom_y0 = self.zoom_y
         else:
@@ -212,6 +653,7 @@ class GraphicField(QFrame):
             for zone in self.zones:
                 if zone.coordinates_are_in_zone(x, y):
                     zone.clicked.emit()
+                    self.zone_clicked.emit(zone)
         self.__mouse_is_pressed = True
 
     def mouseMoveEvent(self, event: QtGui.QMouseEvent) -> None:
@@ -240,6 +682,7 @@ class GraphicField(QFrame):
             width = self.select_end[0] - self.select_start[0]
             height = self.select_end[1] - self.select_start[1]
 
+            self.__leave_zoom_state()
             self.zoom_x, self.zoom_y = self.pixel_to_norm_coord(self.select_start[0], self.select_start[1])
 
             self.zoom_x += self.margin
@@ -263,8 +706,42 @@ class GraphicField(QFrame):
                 self.zoom_w -= 2*self.margin
 
             self.zoomed.emit()
+            self.__enter_zoom_state()
+        elif self.__mode == 'region_select':
+            x0, y0 = self.pixel_to_norm_coord(*self.select_start)
+            x1, y1 = self.pixel_to_norm_coord(*self.select_end)
+            self.region_selected.emit(self.zones_in_rect(min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0)))
         elif self.__mode == 'grab':
             self.setCursor(Qt.CursorShape.OpenHandCursor)
+            self.__enter_zoom_state()
+
+    def zones_at(self, xs, ys):
+        """Gibt für die Punkte (xs, ys) (in normierte Einheiten) eine bool Matrix (Punkt, Zone) zurück."""
+
+        xs = np.ravel(np.asarray(xs, dtype=float))
+        ys = np.ravel(np.asarray(ys, dtype=float))
+        result = np.zeros((len(xs), len(self.zones)), dtype=bool)
+        for i, zone in enumerate(self.zones):
+            result[:, i] = zone.contains_many(xs, ys)
+        return result
+
+    def zone_indices_at(self, xs, ys) -> List[List[int]]:
+        """Gibt für jeden Punkt (xs, ys) die Liste der Indizes (in self.zones) der Zonen zurück, die ihn enthalten."""
+
+        return [np.flatnonzero(row).tolist() for row in self.zones_at(xs, ys)]
+
+    def zones_in_rect(self, x: float, y: float, width: float, height: float) -> List[ZoneOverlap]:
+        """Gibt die Zonen mit Maske zurück, die das Rechteck (in normierte Einheiten) schneiden.
+
+        Zonen mit check_func werden nicht berücksichtigt.
+        """
+
+        overlaps = []
+        for zone in self.zones:
+            overlap = zone.overlap_with_rect(x, y, width, height)
+            if overlap is not None:
+                overlaps.append(overlap)
+        return overlaps
 
     def mouseDoubleClickEvent(self, event: QtGui.QMouseEvent) -> None:
 
@@ -272,9 +749,11 @@ class GraphicField(QFrame):
         for zone in self.zones:
             if zone.coordinates_are_in_zone(x, y):
                 zone.double_clicked.emit()
+                self.zone_double_clicked.emit(zone)
 
     def zoom_in(self, zoom_k: float = 0.2):
         # print(self.zoom_w)
+        self.__leave_zoom_state()
         zoom_w0 = self.zoom_w
         zoom_k = 1 - zoom_k
         self.zoom_w = (self.zoom_w + 2*self.margin)*zoom_k - 2*self.margin
@@ -285,10 +764,12 @@ class GraphicField(QFrame):
         self.zoom_x += d_z
         self.zoom_y += d_z
         self.zoomed.emit()
+        self.__enter_zoom_state()
 
         # print(self.zoom_w)
 
     def zoom_out(self, zoom_k: float = 0.2):
+        self.__leave_zoom_state()
         zoom_w0 = self.zoom_w
         zoom_k = 1 - zoom_k
         self.zoom_w = (self.zoom_w + 2*self.margin)/zoom_k - 2*self.margin
@@ -297,6 +778,7 @@ class GraphicField(QFrame):
         self.zoom_y += d_z
 
         self.zoomed.emit()
+        self.__enter_zoom_state()
 
 
 class GraphicObject(QLabel):
@@ -331,6 +813,7 @@ class GraphicObject(QLabel):
         self.x = x
         self.y = y
         self.reposition()
+        self.gr_field.zoom_history.clear_frames()
 
     def refresh(self):
         self.rescale()
@@ -388,6 +871,79 @@ class BackgroundPicture(GraphicObject):
         self.update()
 
 
+class ViewportIndicator(GraphicObject):
+    """Zeigt den sichtbaren Bereich von 'target' in gr_field (z.B. in einer Übersicht) an.
+
+    Der Rahmen folgt jedem Zoom von 'target'. Mit interactive=True kann er in gr_field mit der Maus
+    verschoben werden (im Mode 'normal'), dabei wird 'target' mitgeschoben.
+    """
+
+    def __init__(self, gr_field: GraphicField, target: GraphicField, pen_color: QColor = Qt.GlobalColor.red,
+                 pen_width: int = 2, interactive: bool = True):
+
+        self.target = target
+        self.pen_color = pen_color
+        self.pen_width = pen_width
+        self.interactive = interactive
+        self.__drag_start: Optional[Tuple[float, float]] = None
+        self.__zoom_x0 = 0
+        self.__zoom_y0 = 0
+
+        super().__init__(gr_field, *target.visible_area()[:2], False)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.target.zoomed.connect(self.refresh)
+        self.gr_field.front_layer.installEventFilter(self)
+        self.refresh()
+        self.show()
+
+    def rescale(self):
+
+        _, _, width, height = self.target.visible_area()
+        self.setFixedWidth(max(self.gr_field.norm_to_pixel_rel_int(width), 1))
+        self.setFixedHeight(max(self.gr_field.norm_to_pixel_rel_int(height), 1))
+        self.update()
+
+    def refresh(self):
+
+        self.x, self.y = self.target.visible_area()[:2]
+        super().refresh()
+
+    def eventFilter(self, a0: QObject, a1: QEvent) -> bool:
+
+        if not self.interactive or self.gr_field.mode() != 'normal':
+            return False
+
+        if a1.type() == QEvent.Type.MouseButtonPress and self.geometry().contains(a1.pos()):
+            self.__drag_start = self.gr_field.pixel_to_norm_coord(a1.pos().x(), a1.pos().y())
+            self.__zoom_x0 = self.target.zoom_x
+            self.__zoom_y0 = self.target.zoom_y
+            self.target.zoom_history.push(self.target.zoom_state())
+            return True
+        elif a1.type() == QEvent.Type.MouseMove and self.__drag_start is not None:
+            x, y = self.gr_field.pixel_to_norm_coord(a1.pos().x(), a1.pos().y())
+            self.target.zoom_x = self.__zoom_x0 + x - self.__drag_start[0]
+            self.target.zoom_y = self.__zoom_y0 + y - self.__drag_start[1]
+            self.target.zoomed.emit()
+            return True
+        elif a1.type() == QEvent.Type.MouseButtonRelease and self.__drag_start is not None:
+            self.__drag_start = None
+            self.target.zoom_history.push(self.target.zoom_state())
+            return True
+        return False
+
+    def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
+
+        super().paintEvent(a0)
+
+        painter = QPainter()
+        painter.begin(self)
+        painter.setPen(QPen(self.pen_color, self.pen_width, Qt.PenStyle.SolidLine))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        half_pen = self.pen_width // 2
+        painter.drawRect(half_pen, half_pen, self.width() - self.pen_width, self.height() - self.pen_width)
+        painter.end()
+
+
 class FrontLayer(QLabel):
 
     def __init__(self, gr_field: GraphicField):
@@ -402,17 +958,14 @@ class FrontLayer(QLabel):
 
         x, y = event.pos().x(), event.pos().y()
         x, y = self.gr_field.pixel_to_norm_coord(x, y)
-        for zone in self.gr_field.zones:
-            if zone.coordinates_are_in_zone(x, y):
-                if not zone.activated:
-                    zone.mouse_enter.emit()
-                    zone.activated = True
-            else:
-                if zone.activated:
-                    zone.mouse_leave.emit()
-                    zone.activated = False
+        self.gr_field.update_hovered_zones(x, y)
         self.gr_field.mouseMoveEvent(event)
 
+    def leaveEvent(self, a0: QEvent) -> None:
+
+        self.gr_field.clear_hovered_zones()
+        super().leaveEvent(a0)
+
     def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
         super().paintEvent(a0)
         self.raise_()
@@ -425,10 +978,23 @@ class FrontLayer(QLabel):
         painter.end()
 
 
+def no_zone(x, y):
+    """check_func einer Zone ohne Maske und ohne eigene Funktion, funktioniert auch mit Arrays."""
+
+    if isinstance(x, (int, float)):
+        return False
+    return np.zeros(np.shape(x), dtype=bool)
+
+
 class GraphicZone(QObject):
 
     mask: NDArray[Shape['Any, Any'], Bool]
+    # Bereich (x, y, Breite, Höhe) in normierte Einheiten, den die Maske abdeckt. None: die Maske beginnt bei (0, 0)
+    # und ihre Breite entspricht x_range des GraphicField (die Pixel sind quadratisch)
+    mask_rect: Optional[Tuple[float, float, float, float]] = None
     check_func: Optional[Callable[[float, float], bool]] = None
+    check_func_vectorized: bool = False  # True, wenn check_func auch mit Arrays xs, ys aufgerufen werden kann
+    mask_image_cache_size: int = 4  # Anzahl der Ausschnitte, die paint_mask als Bild zwischenspeichert
 
     activated: bool = False
     clicked = pyqtSignal()
@@ -438,46 +1004,275 @@ class GraphicZone(QObject):
 
     def __init__(self, gr_field: GraphicField, check_func: Callable[[float, float], bool] = None,
                  mask: NDArray[Shape['Any, Any'], Bool] = None,
-                 mask_file: str = None):
+                 mask_file: str = None,
+                 metadata: Optional[dict] = None,
+                 copy_mask: bool = True,
+                 check_func_vectorized: bool = False,
+                 mask_rect: Optional[Tuple[float, float, float, float]] = None):
 
         super().__init__()
         self.gr_field = gr_field
+        self.metadata = {} if metadata is None else metadata
+
+        # Caches für Bereichsabfragen, werden bei neuer Maske verworfen
+        self.__cache_mask = None
+        self.__bbox = None
+        self.__sat = None
+        self.__pyramid = []
+        self.__images: OrderedDict[Tuple[int, ...], QImage] = OrderedDict()
+
+        if mask_rect is not None:
+            self.mask_rect = tuple(mask_rect)
 
         if check_func is not None:
             self.check_func = check_func
+            self.check_func_vectorized = check_func_vectorized
         elif mask is not None:
-            self.mask = mask.copy()
+            self.mask = mask.copy() if copy_mask else mask
         elif mask_file is not None:
             self.read_mask_from_file(mask_file)
         else:
-            self.check_func = lambda x, y: False
+            self.check_func = no_zone
+            self.check_func_vectorized = True
 
     def read_mask_from_file(self, mask_file: str):
 
-        image_pil = PIL.Image.open(mask_file).convert('L')
+        from PIL import Image
+
+        image_pil = Image.open(mask_file).convert('L')
         image = np.array(image_pil)
         self.mask = image > 10
         self.check_func = None
 
+    def mask_transform(self, level: int = 0) -> Tuple[float, float, float, float]:
+        """Abbildung normierte Einheiten -> Maskenpixel als (x0, y0, k_x, k_y): Index = floor((x - x0)*k_x).
+
+        Für level > 0 bezieht sich die Abbildung auf die entsprechende Stufe der Maskenpyramide.
+        """
+
+        n_y, n_x = self.mask.shape
+        if self.mask_rect is None:
+            x0, y0 = 0, 0
+            k_x = k_y = n_x / self.gr_field.x_range
+        else:
+            x0, y0, width, height = self.mask_rect
+            k_x = n_x / width
+            k_y = n_y / height
+        return x0, y0, k_x / 2**level, k_y / 2**level
+
+    def mask_level(self, level: int):
+        """Stufe 'level' der Maskenpyramide (bool Max-Pooling 2x2 pro Stufe), wird bei Bedarf erzeugt."""
+
+        self.__check_cache()
+        while len(self.__pyramid) <= level:
+            previous = self.__pyramid[-1]
+            n_y, n_x = previous.shape
+            padded = np.zeros((n_y + n_y % 2, n_x + n_x % 2), dtype=bool)
+            padded[:n_y, :n_x] = previous
+            self.__pyramid.append(padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).any(axis=(1, 3)))
+        return self.__pyramid[level]
+
+    def level_for_pixel_scale(self, pixels_per_norm: float) -> int:
+        """Gröbste Stufe der Pyramide, die noch mindestens so fein ist wie pixels_per_norm."""
+
+        _, _, k_x, k_y = self.mask_transform()
+        if pixels_per_norm <= 0:
+            return 0
+        level = math.floor(math.log2(max(min(k_x, k_y) / pixels_per_norm, 1)))
+        max_level = math.ceil(math.log2(max(self.mask.shape))) if max(self.mask.shape) > 1 else 0
+        return min(level, max_level)
+
     def coordinates_are_in_zone(self, x: float, y: float) -> bool:
         if self.check_func is not None:
             return self.check_func(x, y)
         else:
             n_y, n_x = self.mask.shape
-            k = n_x/self.gr_field.x_range
-            x_index = round(x*k)
-            y_index = round(y*k)
-            try:
-                return self.mask[y_index, x_index]
-            except IndexError:
-                return False
+            x0, y0, k_x, k_y = self.mask_transform()
+            x_index = math.floor((x - x0)*k_x)
+            y_index = math.floor((y - y0)*k_y)
+            if 0 <= x_index < n_x and 0 <= y_index < n_y:
+                return bool(self.mask[y_index, x_index])
+            return False
+
+    def contains_many(self, xs, ys, level: int = 0):
+        """Vektorisierte Variante von coordinates_are_in_zone. Gibt ein bool Array der Form von xs zurück.
+
+        Mit level > 0 wird eine gröbere Stufe der Pyramide benutzt (True heißt dann "Zone in der Nähe").
+        """
+
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        if self.check_func is not None:
+            if self.check_func_vectorized:
+                return np.broadcast_to(np.asarray(self.check_func(xs, ys), dtype=bool), xs.shape)
+            return np.fromiter((self.check_func(x, y) for x, y in zip(xs.flat, ys.flat)),
+                               dtype=bool, count=xs.size).reshape(xs.shape)
+
+        mask = self.mask_level(level)
+        n_y, n_x = mask.shape
+        x0, y0, k_x, k_y = self.mask_transform(level)
+        x_index = np.floor((xs - x0)*k_x)
+        y_index = np.floor((ys - y0)*k_y)
+        inside = (x_index >= 0) & (x_index < n_x) & (y_index >= 0) & (y_index < n_y)
+        result = np.zeros(xs.shape, dtype=bool)
+        result[inside] = mask[y_index[inside].astype(np.intp), x_index[inside].astype(np.intp)]
+        return result
+
+    def __mask_index_rect(self, x: float, y: float, width: float, height: float) -> Tuple[int, int, int, int]:
+        """Rechteck in normierte Einheiten -> (x0, y0, x1, y1) Indizes der Maske (x1, y1 exklusiv, beschnitten).
+
+        Ein Pixel gehört zum Rechteck, wenn sein Mittelpunkt darin liegt.
+        """
+
+        n_y, n_x = self.mask.shape
+        origin_x, origin_y, k_x, k_y = self.mask_transform()
+        x0 = min(max(math.floor((x - origin_x)*k_x + 0.5), 0), n_x)
+        y0 = min(max(math.floor((y - origin_y)*k_y + 0.5), 0), n_y)
+        x1 = min(max(math.floor((x + width - origin_x)*k_x + 0.5), 0), n_x)
+        y1 = min(max(math.floor((y + height - origin_y)*k_y + 0.5), 0), n_y)
+        return x0, y0, x1, y1
+
+    def __check_cache(self):
+
+        if self.__cache_mask is not self.mask:
+            self.__cache_mask = self.mask
+            self.__bbox = None
+            self.__sat = None
+            self.__pyramid = [self.mask]
+            self.__images = OrderedDict()
+
+    def bounding_box(self) -> Optional[Tuple[int, int, int, int]]:
+        """Bounding Box der Maske als (x0, y0, x1, y1) Indizes (x1, y1 exklusiv), None für eine leere Maske."""
+
+        self.__check_cache()
+        if self.__bbox is None:
+            rows = np.flatnonzero(np.any(self.mask, axis=1))
+            if len(rows) == 0:
+                self.__bbox = ()
+            else:
+                columns = np.flatnonzero(np.any(self.mask, axis=0))
+                self.__bbox = (int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1)
+        return self.__bbox or None
+
+    def summed_area_table(self):
+        """Integralbild der Maske innerhalb der Bounding Box, mit einer Null-Zeile und -Spalte am Anfang.
+
+        Die Form ist (y1 - y0 + 1, x1 - x0 + 1) für bounding_box() = (x0, y0, x1, y1), Index [0, 0] entspricht
+        dem Maskenpixel (x0, y0). Für eine leere Maske ist das Ergebnis ein 1x1 Array mit 0.
+        """
+
+        self.__check_cache()
+        if self.__sat is None:
+            bbox = self.bounding_box()
+            if bbox is None:
+                self.__sat = np.zeros((1, 1), dtype=np.int32)
+                return self.__sat
+            x0, y0, x1, y1 = bbox
+            crop = self.mask[y0:y1, x0:x1]
+            n_y, n_x = crop.shape
+            dtype = np.int32 if n_x * n_y < 2**31 else np.int64
+            sat = np.zeros((n_y + 1, n_x + 1), dtype=dtype)
+            np.cumsum(crop, axis=0, dtype=dtype, out=sat[1:, 1:])
+            np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+            self.__sat = sat
+        return self.__sat
+
+    def pixel_count_in_rect(self, x: float, y: float, width: float, height: float) -> int:
+        """Anzahl der Maskenpixel im Rechteck (in normierte Einheiten), O(1) nach dem Aufbau des Integralbildes."""
+
+        bbox = self.bounding_box()
+        if bbox is None:
+            return 0
+        x0, y0, x1, y1 = self.__mask_index_rect(x, y, width, height)
+        # auf die Bounding Box beschneiden und in Indizes des Integralbildes umrechnen
+        x0, x1 = max(x0, bbox[0]) - bbox[0], min(x1, bbox[2]) - bbox[0]
+        y0, y1 = max(y0, bbox[1]) - bbox[1], min(y1, bbox[3]) - bbox[1]
+        if x0 >= x1 or y0 >= y1:
+            return 0
+        sat = self.summed_area_table()
+        return int(sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0])
+
+    def overlap_with_rect(self, x: float, y: float, width: float, height: float) -> Optional[ZoneOverlap]:
+        """Überschneidung der Zone mit dem Rechteck (in normierte Einheiten), None wenn es keine gibt."""
+
+        if self.check_func is not None:
+            return None
+        count = self.pixel_count_in_rect(x, y, width, height)
+        if count == 0:
+            return None
+        _, _, k_x, k_y = self.mask_transform()
+        area = count / (k_x * k_y)
+        rect_fraction = area / (width * height) if width * height > 0 else 0
+        zone_fraction = count / int(self.summed_area_table()[-1, -1])
+        return ZoneOverlap(self, area, rect_fraction, zone_fraction)
+
+    def __mask_image(self, level: int, color: QColor, x0: int, y0: int, x1: int, y1: int) -> QImage:
+        """ARGB Bild des Ausschnitts [y0:y1, x0:x1] der Stufe 'level', die letzten Bilder werden zwischengespeichert."""
+
+        self.__check_cache()
+        key = (level, color.rgba(), x0, y0, x1, y1)
+        try:
+            self.__images.move_to_end(key)
+            return self.__images[key]
+        except KeyError:
+            pass
+
+        pixels = np.where(self.mask_level(level)[y0:y1, x0:x1], np.uint32(color.rgba()), np.uint32(0))
+        image = QImage(pixels.data, x1 - x0, y1 - y0, 4 * (x1 - x0), QImage.Format.Format_ARGB32).copy()
+        self.__images[key] = image
+        if len(self.__images) > self.mask_image_cache_size:
+            self.__images.popitem(last=False)
+        return image
+
+    def paint_mask(self, painter: QPainter, color: QColor, gr_field: Optional[GraphicField] = None):
+        """Zeichnet den sichtbaren Teil der Maske in gr_field (Standard: self.gr_field).
+
+        Benutzt wird die Stufe der Pyramide, die der Vergrößerung von gr_field entspricht.
+        """
+
+        if self.check_func is not None:
+            return
+        if gr_field is None:
+            gr_field = self.gr_field
+        level = self.level_for_pixel_scale(gr_field.norm_to_pixel_rel(1))
+        n_y, n_x = self.mask_level(level).shape
+        origin_x, origin_y, k_x, k_y = self.mask_transform(level)
+
+        # nur die Maskenpixel, die in gr_field sichtbar sind
+        x, y, width, height = gr_field.visible_area()
+        x0 = min(max(math.floor((x - origin_x)*k_x), 0), n_x)
+        y0 = min(max(math.floor((y - origin_y)*k_y), 0), n_y)
+        x1 = min(max(math.ceil((x + width - origin_x)*k_x), 0), n_x)
+        y1 = min(max(math.ceil((y + height - origin_y)*k_y), 0), n_y)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        pixel_x, pixel_y = gr_field.norm_to_pixel_coord(origin_x + x0/k_x, origin_y + y0/k_y)
+        target = QRectF(pixel_x, pixel_y, gr_field.norm_to_pixel_rel((x1 - x0)/k_x),
+                        gr_field.norm_to_pixel_rel((y1 - y0)/k_y))
+        painter.drawImage(target, self.__mask_image(level, color, x0, y0, x1, y1))
 
     def paint(self, painter: QPainter_ext):
         pass
 
 
+class ZoneOverlap(NamedTuple):
+    """Überschneidung einer Zone mit einem Rechteck. Fläche in normierte Einheiten."""
+
+    zone: GraphicZone
+    area: float
+    rect_fraction: float  # Anteil des Rechtecks, der von der Zone bedeckt ist
+    zone_fraction: float  # Anteil der Zone, der im Rechteck liegt
+
+
 AXES_PARAMETERS: Dict[Tuple[int, int, int], dict] = {}
-AXES_DEFINER = np.array([-rect(1, -pi/6), rect(1, pi/6), rect(1, -pi/2)])
+AXES_DEFINER: Tuple[complex, complex, complex] = (-rect(1, -pi/6), rect(1, pi/6), rect(1, -pi/2))
+
+
+def axis_direction(definition: Tuple[int, int, int]) -> complex:
+    """Richtung einer Achse in der Bildebene (entspricht np.dot(definition, AXES_DEFINER))."""
+
+    return sum(k * e for k, e in zip(definition, AXES_DEFINER))
 
 
 class Axes(GraphicObject):
@@ -605,7 +1400,7 @@ class Axis:
 
         # die Pfeile zeichnen
         arrow_length_p = self.axes_obj.gr_field.norm_to_pixel_rel(self.axes_obj.arrow_length)
-        arrow_direction = np.dot(self.definition, AXES_DEFINER)
+        arrow_direction = axis_direction(self.definition)
         arrow_from_center = arrow_length_p * arrow_direction
         arrow_end = center + arrow_from_center
 
@@ -657,7 +1452,7 @@ class RoundAxis(Axis):
 
         # die Pfeile zeichnen
         arrow_length_p = self.axes_obj.gr_field.norm_to_pixel_rel(self.axes_obj.arrow_length)
-        arrow_direction = np.dot(self.definition, AXES_DEFINER)
+        arrow_direction = axis_direction(self.definition)
         from_coord_center_to_round_center = (1 + self.shift + self.rel_width/2) * arrow_length_p * arrow_direction
         round_center = center + from_coord_center_to_round_center
 
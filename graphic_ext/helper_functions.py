@@ -1,3 +1,30 @@
+from importlib import import_module
+from types import ModuleType
+
+
+class LazyModule:
+    """Stellvertreter für ein Modul, das erst beim ersten Attributzugriff importiert wird.
+
+    Der Stellvertreter bleibt lokal im importierenden Modul, sys.modules wird erst durch den echten Import geändert.
+    """
+
+    def __init__(self, name: str):
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attribute: str):
+        if self.__module is None:
+            self.__module = import_module(self.__name)
+        return getattr(self.__module, attribute)
+
+    def __repr__(self) -> str:
+        return f'<LazyModule {self.__name!r}>'
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Gibt einen LazyModule Stellvertreter für das Modul 'name' zurück."""
+
+    return LazyModule(name)
 
 
 def complex_to_tuple_rounded(c_number: complex) -> (int, int):
@@ -13,4 +40,4 @@ def set_attributes(target_object, parameters: dict):
 
     for name, value in parameters.items():
         getattr(target_object, name)
-        setattr(target_object, name, value)
\ No newline at end of file
+        setattr(target_object, name, value)
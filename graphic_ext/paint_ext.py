@@ -1,8 +1,9 @@
 from cmath import pi, rect
+from collections import OrderedDict
 from typing import Tuple
 
-from PyQt6.QtCore import QObject, QRect, Qt
-from PyQt6.QtGui import QPainter, QPainterPath
+from PyQt6.QtCore import QObject, QPointF, Qt
+from PyQt6.QtGui import QPainter, QPainterPath, QStaticText, QFont, QTransform
 
 from graphic_ext.helper_functions import set_attributes, complex_to_tuple_rounded
 
@@ -121,6 +122,34 @@ def draw_round_arrow(center: Tuple[int, int],
     draw_arrow_p(end, end, arrow_head1, arrow_head2, painter, filled_arrow_head)
 
 
+TEXT_CACHE_SIZE = 512
+_TEXT_CACHE: OrderedDict[Tuple[str, str], QStaticText] = OrderedDict()
+
+
+def static_text(text: str, font: QFont) -> QStaticText:
+    """Gibt ein vorbereitetes QStaticText für (text, font) aus dem Cache zurück."""
+
+    key = (text, font.key())
+    try:
+        _TEXT_CACHE.move_to_end(key)
+        return _TEXT_CACHE[key]
+    except KeyError:
+        pass
+
+    s_text = QStaticText(text)
+    s_text.setTextFormat(Qt.TextFormat.PlainText)
+    s_text.prepare(QTransform(), font)
+    _TEXT_CACHE[key] = s_text
+    if len(_TEXT_CACHE) > TEXT_CACHE_SIZE:
+        _TEXT_CACHE.popitem(last=False)
+    return s_text
+
+
+def clear_text_cache():
+
+    _TEXT_CACHE.clear()
+
+
 class QPainter_ext(QPainter):
 
     def __init__(self, *args, **kwargs):
@@ -163,13 +192,9 @@ class QPainter_ext(QPainter):
 
     def drawText_centered(self, center_point: Tuple[int, int], text: str):
 
-        rect_height = 2 * self.font().pointSize()
-        rect_width = rect_height * len(text)
-        rect_position = complex(*center_point) - complex(rect_width, rect_height) / 2
-        rect_position = complex_to_tuple_rounded(rect_position)
-        text_rect = QRect(*rect_position, rect_width, rect_height)
-
-        self.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, text)
+        s_text = static_text(text, self.font())
+        size = s_text.size()
+        self.drawStaticText(QPointF(center_point[0] - size.width()/2, center_point[1] - size.height()/2), s_text)
 
 
 
@@ -0,0 +1,237 @@
+"""Deterministisches Abspielen von Interaktionen mit einem GraphicField zum Messen von Latenz und Zeichenzeit.
+
+Ein Skript ist eine Liste von Schritten (Tupel), z.B.:
+    [('mode', 'grab'), ('press', 100, 100), ('move', 120, 100), ('release', 120, 100),
+     ('zoom_in', 0.2), ('zoom_out', 0.2), ('double_click', 50, 50), ('resize', 800, 800)]
+Koordinaten der Mausschritte sind in Pixel des GraphicField.
+
+Beispiel (headless):
+    QT_QPA_PLATFORM=offscreen python -m graphic_ext.replay --objects 200 --zones 50 --frame-budget 30
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import List, Tuple, Dict, Optional, Iterable, NamedTuple
+
+from PyQt6.QtCore import Qt, QPoint, QObject, QEvent
+from PyQt6.QtGui import QPixmap, QColor, QPainter
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication
+
+from graphic_ext.gr_field import GraphicField, GraphicZone, Axes
+from graphic_ext.helper_functions import lazy_import
+
+np = lazy_import('numpy')
+
+MOUSE_STEPS = ('move', 'press', 'release', 'double_click')
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+def build_scene(n_objects: int = 100, n_zones: int = 20, background_size: Tuple[int, int] = (1000, 1000),
+                seed: int = 0, field_size: Tuple[int, int] = (600, 600)) -> GraphicField:
+    """Erzeugt reproduzierbar ein GraphicField mit Hintergrund, n_objects Achsen und n_zones Maskenzonen."""
+
+    rng = random.Random(seed)
+    width, height = background_size
+
+    field = GraphicField()
+    background = QPixmap(width, height)
+    background.fill(QColor('lightsteelblue'))
+    painter = QPainter(background)
+    for _ in range(200):
+        painter.fillRect(rng.randrange(width), rng.randrange(height), rng.randrange(1, width // 10 + 2),
+                         rng.randrange(1, height // 10 + 2), QColor.fromHsv(rng.randrange(360), 80, 220))
+    painter.end()
+    field.set_background(background)
+
+    for _ in range(n_zones):
+        mask = np.zeros((height, width), dtype=bool)
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        mask[y0:y0 + rng.randrange(1, height // 4 + 2), x0:x0 + rng.randrange(1, width // 4 + 2)] = True
+        field.zones.append(GraphicZone(field, mask=mask, copy_mask=False))
+
+    arrow_length = min(width, height) / 40
+    for _ in range(n_objects):
+        axes = Axes(field, rng.uniform(0, width), rng.uniform(0, height), arrow_length)
+        axes.def_axes([('X', (1, 0, 0), False), ('Y', (0, 1, 0), False), ('Z', (0, 0, 1), True)])
+
+    field.resize(*field_size)
+    field.show()
+    QApplication.processEvents()
+    return field
+
+
+def hover_script(field_size: Tuple[int, int] = (600, 600), steps: int = 200, seed: int = 0) -> List[tuple]:
+    """Maus wandert ohne gedrückte Taste über das Feld (Mode 'normal')."""
+
+    rng = random.Random(seed)
+    width, height = field_size
+    return [('mode', 'normal')] + [('move', rng.randrange(width), rng.randrange(height)) for _ in range(steps)]
+
+
+def grab_pan_script(field_size: Tuple[int, int] = (600, 600), steps: int = 100) -> List[tuple]:
+    """Verschiebt die Ansicht im Mode 'grab' einmal quer über das Feld."""
+
+    width, height = field_size
+    script = [('mode', 'grab'), ('zoom_in', 0.5), ('press', width // 4, height // 4)]
+    for i in range(1, steps + 1):
+        script.append(('move', width // 4 + i * width // (2 * steps), height // 4 + i * height // (2 * steps)))
+    script.append(('release', 3 * width // 4, 3 * height // 4))
+    return script + [('mode', 'normal')]
+
+
+class ReplayReport(NamedTuple):
+    """Gemessene Zeiten in Millisekunden."""
+
+    event_latencies: Dict[str, List[float]]  # pro Art des Schrittes
+    frame_times: List[float]  # Zeit für ein komplettes Neuzeichnen nach jedem Schritt
+
+    @staticmethod
+    def percentile(values: Iterable[float], q: float) -> float:
+
+        values = list(values)
+        if not values:
+            return 0.
+        return float(np.percentile(values, q))
+
+    def all_latencies(self) -> List[float]:
+        return [value for values in self.event_latencies.values() for value in values]
+
+    def summary(self) -> str:
+
+        lines = [f'{"step":<14}{"n":>6}{"p50 ms":>10}{"p95 ms":>10}{"max ms":>10}']
+        rows = list(self.event_latencies.items()) + [('frame', self.frame_times)]
+        for name, values in rows:
+            lines.append(f'{name:<14}{len(values):>6}{self.percentile(values, 50):>10.2f}'
+                         f'{self.percentile(values, 95):>10.2f}{max(values, default=0):>10.2f}')
+        return '\n'.join(lines)
+
+    def check_budgets(self, event_budget: Optional[float] = None, frame_budget: Optional[float] = None,
+                      percentile: float = 95):
+        """Wirft BudgetExceeded, wenn das Perzentil der Latenz bzw. Zeichenzeit das Budget (ms) überschreitet."""
+
+        errors = []
+        if event_budget is not None:
+            for name, values in self.event_latencies.items():
+                value = self.percentile(values, percentile)
+                if value > event_budget:
+                    errors.append(f'{name}: p{percentile:g} Latenz {value:.2f} ms > {event_budget} ms')
+        if frame_budget is not None:
+            value = self.percentile(self.frame_times, percentile)
+            if value > frame_budget:
+                errors.append(f'frame: p{percentile:g} Zeichenzeit {value:.2f} ms > {frame_budget} ms')
+        if errors:
+            raise BudgetExceeded('\n'.join(errors))
+
+
+def run_step(field: GraphicField, step: tuple):
+
+    kind, *args = step
+    target = field.front_layer
+    if kind == 'move':
+        QTest.mouseMove(target, QPoint(*args))
+    elif kind == 'press':
+        QTest.mousePress(target, Qt.MouseButton.LeftButton, pos=QPoint(*args))
+    elif kind == 'release':
+        QTest.mouseRelease(target, Qt.MouseButton.LeftButton, pos=QPoint(*args))
+    elif kind == 'double_click':
+        QTest.mouseDClick(target, Qt.MouseButton.LeftButton, pos=QPoint(*args))
+    elif kind == 'mode':
+        field.set_mode(*args)
+    elif kind == 'zoom_in':
+        field.zoom_in(*args)
+    elif kind == 'zoom_out':
+        field.zoom_out(*args)
+    elif kind == 'zoom_reset':
+        field.zoom_reset()
+    elif kind == 'resize':
+        field.resize(*args)
+    else:
+        raise ValueError(f'Unbekannter Schritt: "{kind}". Mögliche Variante: '
+                         f'{list(MOUSE_STEPS) + ["mode", "zoom_in", "zoom_out", "zoom_reset", "resize"]}')
+
+
+def replay(field: GraphicField, script: Iterable[tuple], measure_frames: bool = True) -> ReplayReport:
+    """Spielt das Skript ab und misst pro Schritt die Latenz und (optional) die Zeit für ein Neuzeichnen.
+
+    Die Latenz umfasst das Verarbeiten des Schrittes und aller dadurch ausgelösten Events.
+    Die Zeichenzeit wird mit einem synchronen repaint() des ganzen Feldes gemessen.
+    """
+
+    latencies: Dict[str, List[float]] = {}
+    frame_times = []
+    for step in script:
+        t0 = time.perf_counter()
+        run_step(field, step)
+        QApplication.processEvents()
+        latencies.setdefault(step[0], []).append(1000 * (time.perf_counter() - t0))
+
+        if measure_frames:
+            t0 = time.perf_counter()
+            field.repaint()
+            frame_times.append(1000 * (time.perf_counter() - t0))
+
+    return ReplayReport(latencies, frame_times)
+
+
+class InteractionRecorder(QObject):
+    """Zeichnet Mausschritte auf dem GraphicField als Skript für replay() auf."""
+
+    def __init__(self, field: GraphicField):
+        super().__init__(field)
+        self.field = field
+        self.script: List[tuple] = []
+        field.front_layer.installEventFilter(self)
+
+    def eventFilter(self, a0: QObject, a1: QEvent) -> bool:
+
+        kinds = {QEvent.Type.MouseMove: 'move',
+                 QEvent.Type.MouseButtonPress: 'press',
+                 QEvent.Type.MouseButtonRelease: 'release',
+                 QEvent.Type.MouseButtonDblClick: 'double_click'}
+        kind = kinds.get(a1.type())
+        if kind is not None:
+            position = a1.position().toPoint()
+            self.script.append((kind, position.x(), position.y()))
+        return False
+
+    def stop(self) -> List[tuple]:
+
+        self.field.front_layer.removeEventFilter(self)
+        return self.script
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+
+    parser = argparse.ArgumentParser(description='Misst Latenz und Zeichenzeit von GraphicField.')
+    parser.add_argument('--objects', type=int, default=100)
+    parser.add_argument('--zones', type=int, default=20)
+    parser.add_argument('--background', type=int, nargs=2, default=(1000, 1000), metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--event-budget', type=float, default=None, help='ms, Perzentil --percentile')
+    parser.add_argument('--frame-budget', type=float, default=None, help='ms, Perzentil --percentile')
+    parser.add_argument('--percentile', type=float, default=95)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])  # noqa: F841
+    field = build_scene(args.objects, args.zones, tuple(args.background), args.seed)
+    size = (field.width(), field.height())
+    script = hover_script(size, seed=args.seed) + grab_pan_script(size) + [('resize', 800, 800), ('zoom_reset',)]
+    report = replay(field, script)
+    print(report.summary())
+    try:
+        report.check_budgets(args.event_budget, args.frame_budget, args.percentile)
+    except BudgetExceeded as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import json
+import os
+import re
+from typing import List, Optional, TYPE_CHECKING
+
+from graphic_ext.helper_functions import lazy_import
+
+if TYPE_CHECKING:
+    from graphic_ext.gr_field import GraphicField, GraphicZone
+
+np = lazy_import('numpy')
+
+SCENE_FILE = 'scene.json'
+SCENE_VERSION = 1
+BACKGROUND_FILE = 'background.png'
+ZONE_MASK_FILE_PATTERN = re.compile(r'zone_(\d+)\.npy')
+
+
+def zone_mask_file(index: int) -> str:
+    return f'zone_{index}.npy'
+
+
+def file_id(file_path: str) -> tuple:
+
+    stat = os.stat(file_path)
+    return stat.st_dev, stat.st_ino
+
+
+def is_mapped_from(mask, file_path: str) -> bool:
+    """True, wenn mask das unveränderte memmap aus load_scene ist und file_path noch die gemappte Datei ist.
+
+    Verglichen werden Gerät und Inode: mask.filename zeigt nach os.replace auf eine andere Datei.
+    """
+
+    mapped_file = getattr(mask, 'scene_file_id', None)
+    return mapped_file is not None and os.path.exists(file_path) and file_id(file_path) == mapped_file
+
+
+def save_mask(file_path: str, mask):
+    """Speichert mask über eine temporäre Datei, damit eine noch gemappte Datei nicht abgeschnitten wird."""
+
+    if is_mapped_from(mask, file_path):
+        return  # die Datei enthält die Maske schon
+    temp_path = file_path + '.tmp.npy'
+    np.save(temp_path, np.asarray(mask, dtype=bool))
+    os.replace(temp_path, file_path)
+
+
+def save_scene(gr_field: 'GraphicField', path: str, metadata: Optional[dict] = None):
+    """Speichert die Szene von gr_field in Ordner 'path'.
+
+    Die Masken werden als einzelne .npy Dateien (bool) gespeichert, damit sie beim Laden gemappt werden
+    können. Alle Dateien werden über temporäre Dateien ersetzt, daher kann eine Szene auch in den Ordner
+    gespeichert werden, aus dem sie (gemappt) geladen wurde. Übrige zone_N.npy von früher werden gelöscht.
+    Zonen mit check_func lassen sich nicht speichern und werden übersprungen.
+    Der Hintergrund wird als Verweis auf die Datei gespeichert, falls er aus einer Datei stammt,
+    sonst als background.png in 'path'.
+    """
+
+    os.makedirs(path, exist_ok=True)
+
+    background = None
+    if gr_field.background_file is not None:
+        background = os.path.abspath(gr_field.background_file)
+    elif gr_field.background.pixmap() is not None and not gr_field.background.pixmap().isNull():
+        gr_field.background.pixmap().save(os.path.join(path, BACKGROUND_FILE))
+        background = BACKGROUND_FILE
+
+    objects = [{'x': obj.x, 'y': obj.y} for obj in gr_field.objects if obj is not gr_field.background]
+
+    zones = []
+    for zone in gr_field.zones:
+        if zone.check_func is not None:
+            continue
+        file_name = zone_mask_file(len(zones))
+        save_mask(os.path.join(path, file_name), zone.mask)
+        zones.append({'mask': file_name, 'mask_rect': zone.mask_rect, 'metadata': zone.metadata})
+
+    scene = {'version': SCENE_VERSION,
+             'x_range': gr_field.x_range,
+             'y_range': gr_field.y_range,
+             'margin': gr_field.margin,
+             'zoom': list(gr_field.zoom_state()),
+             'background': background,
+             'objects': objects,
+             'zones': zones,
+             'metadata': {} if metadata is None else metadata}
+
+    scene_path = os.path.join(path, SCENE_FILE)
+    with open(scene_path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(scene, file, indent=1)
+    os.replace(scene_path + '.tmp', scene_path)
+
+    # Masken von Zonen, die es nicht mehr gibt
+    for name in os.listdir(path):
+        match = ZONE_MASK_FILE_PATTERN.fullmatch(name)
+        if match is not None and int(match.group(1)) >= len(zones):
+            os.remove(os.path.join(path, name))
+
+
+def read_scene_info(path: str) -> dict:
+
+    with open(os.path.join(path, SCENE_FILE), encoding='utf-8') as file:
+        scene = json.load(file)
+    if scene.get('version') != SCENE_VERSION:
+        raise ValueError(f'Unbekannte Version der Szene: {scene.get("version")}. Erwartet: {SCENE_VERSION}')
+    return scene
+
+
+def load_scene(gr_field: 'GraphicField', path: str, mmap: bool = True) -> List['GraphicZone']:
+    """Lädt eine mit save_scene gespeicherte Szene in gr_field.
+
+    Die Masken werden mit mmap=True nur gemappt und erst bei Zugriff von der Platte gelesen.
+    Die gespeicherten Positionen werden der Reihe nach auf die schon existierenden Objekte von gr_field
+    übertragen. Die geladenen Zonen werden zu gr_field.zones hinzugefügt und zurückgegeben.
+    """
+
+    from graphic_ext.gr_field import GraphicZone
+
+    scene = read_scene_info(path)
+
+    background = scene['background']
+    if background is not None:
+        gr_field.set_background_from_file(os.path.join(path, background), use_picture_coordinates=False)
+
+    gr_field.scene.set_ranges(scene['x_range'], scene['y_range'])
+    gr_field.margin = scene['margin']
+
+    objects = [obj for obj in gr_field.objects if obj is not gr_field.background]
+    for obj, position in zip(objects, scene['objects']):
+        obj.move_to(position['x'], position['y'])
+
+    mmap_mode = 'r' if mmap else None
+    zones = []
+    for zone_info in scene['zones']:
+        mask_path = os.path.join(path, zone_info['mask'])
+        mask = np.load(mask_path, mmap_mode=mmap_mode)
+        if mmap:
+            # nur dieses Objekt (keine Views davon) gilt beim Speichern als schon in der Datei
+            mask.scene_file_id = file_id(mask_path)
+        zones.append(GraphicZone(gr_field, mask=mask, metadata=zone_info['metadata'], copy_mask=False,
+                                 mask_rect=zone_info.get('mask_rect')))
+    gr_field.zones.extend(zones)
+
+    gr_field.zoom_history.clear()
+    gr_field.zoom_x, gr_field.zoom_y, gr_field.zoom_w = scene['zoom']
+    gr_field.zoomed.emit()
+
+    return zones
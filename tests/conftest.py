@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt6 import QtWidgets
+except ImportError:
+    # ohne PyQt6 lässt sich graphic_ext nicht benutzen, nur test_graphic_ext.py prüft ohne Qt
+    QtWidgets = None
+    collect_ignore = [path.name for path in Path(__file__).parent.glob('test_*.py')
+                      if path.name != 'test_graphic_ext.py']
+
+
+@pytest.fixture(scope='session')
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
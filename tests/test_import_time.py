@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# "from graphic_ext import GraphicField" darf höchstens so lange dauern wie IMPORT_TIME_RATIO mal der Import von
+# PyQt6.QtCore/QtGui/QtWidgets im selben Prozess (gemessen ca. 0.7). Das Verhältnis hängt kaum von der Last
+# des Rechners ab, die eigentliche Absicherung sind die Prüfungen von sys.modules.
+IMPORT_TIME_RATIO = 3
+# Absolutes Budget in Sekunden nur auf Wunsch, z.B. GRAPHIC_EXT_IMPORT_BUDGET=0.08 auf einem ruhigen Rechner
+IMPORT_TIME_BUDGET_VARIABLE = 'GRAPHIC_EXT_IMPORT_BUDGET'
+
+
+def run_python(code: str) -> str:
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def loaded_modules(code: str, modules) -> list:
+    output = run_python(code + '\nimport sys\n'
+                        f'print(",".join(m for m in {tuple(modules)!r} if m in sys.modules))')
+    return [m for m in output.split(',') if m]
+
+
+def test_painter_without_widgets():
+    loaded = loaded_modules('from graphic_ext import QPainter_ext',
+                            ['numpy', 'PIL', 'nptyping', 'PyQt6.QtWidgets'])
+    assert loaded == []
+
+
+def test_gr_field_without_optional_modules():
+    loaded = loaded_modules('from graphic_ext import GraphicField',
+                            ['numpy', 'PIL', 'nptyping'])
+    assert loaded == []
+
+
+def import_times() -> (float, float):
+    """Sekunden für den Import von PyQt6 und danach von GraphicField in einem frischen Prozess."""
+
+    output = run_python('import time\n'
+                        't0 = time.perf_counter()\n'
+                        'import PyQt6.QtCore, PyQt6.QtGui, PyQt6.QtWidgets\n'
+                        't1 = time.perf_counter()\n'
+                        'from graphic_ext import GraphicField\n'
+                        'print(t1 - t0, time.perf_counter() - t1)')
+    qt_time, field_time = map(float, output.split())
+    return qt_time, field_time
+
+
+def test_import_time_relative_to_qt():
+    # bestes von drei Verhältnissen, ein einzelner Ausreißer soll den Test nicht scheitern lassen
+    ratio = min(field_time / qt_time for qt_time, field_time in (import_times() for _ in range(3)))
+    assert ratio < IMPORT_TIME_RATIO
+
+
+@pytest.mark.skipif(IMPORT_TIME_BUDGET_VARIABLE not in os.environ,
+                    reason=f'absolutes Budget nur mit {IMPORT_TIME_BUDGET_VARIABLE}=<Sekunden>')
+def test_import_time_budget():
+    elapsed = min(import_times()[1] for _ in range(3))
+    assert elapsed < float(os.environ[IMPORT_TIME_BUDGET_VARIABLE])
@@ -0,0 +1,211 @@
+"""OpenGL Hintergrundebene von GraphicField.
+
+Der Vergleich mit dem QPainter Weg über QOpenGLWidget braucht einen OpenGL Kontext von Qt. Ohne GPU geht das mit
+Mesa (Software Rasterizer) unter Xvfb:
+    LIBGL_ALWAYS_SOFTWARE=1 QT_QPA_PLATFORM=xcb xvfb-run -a -s '-screen 0 1024x768x24' \\
+        python -m pytest tests/test_opengl_backend.py
+Die Plattform 'offscreen' von Qt erzeugt keinen OpenGL Kontext, der Test wird dann übersprungen.
+
+Die Shader und die Abbildung normierte Einheiten -> NDC werden zusätzlich ohne Qt Kontext geprüft: diese Datei
+läuft als eigener Prozess mit PYOPENGL_PLATFORM=egl, erzeugt einen surfaceless EGL Kontext von Mesa (llvmpipe),
+zeichnet background_rects() mit VERTEX_SHADER/FRAGMENT_SHADER in ein Framebuffer Object und vergleicht das Bild
+mit GraphicField.grab(). Direkt aufrufbar:
+    PYOPENGL_PLATFORM=egl LIBGL_ALWAYS_SOFTWARE=1 QT_QPA_PLATFORM=offscreen python tests/test_opengl_backend.py
+Ohne GPU ist bei Fehlschlägen der OpenGL Weg abgeschaltet, GraphicField fällt auf den QPainter Weg zurück.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPixmap, QColor, QPainter, QImage
+from PyQt6.QtWidgets import QApplication
+
+from graphic_ext.gl_backend import opengl_is_available
+from graphic_ext.gr_field import GraphicField
+
+EGL_UNAVAILABLE = 77
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def quadrant_pixmap() -> QPixmap:
+    # vier Farben, damit eine gespiegelte oder verschobene Textur auffällt
+    pixmap = QPixmap(100, 100)
+    painter = QPainter(pixmap)
+    for (x, y), color in zip([(0, 0), (50, 0), (0, 50), (50, 50)], ['red', 'green', 'blue', 'yellow']):
+        painter.fillRect(x, y, 50, 50, QColor(color))
+    painter.end()
+    return pixmap
+
+
+def rendered_field(app, use_opengl: bool) -> GraphicField:
+    field = GraphicField(use_opengl=use_opengl)
+    field.set_background(quadrant_pixmap())
+    field.resize(200, 200)
+    field.show()
+    app.processEvents()
+    return field
+
+
+def comparable_pixels(image: QImage, step: int = 7):
+    """Pixel (x, y) im Raster step, deren 5x5 Umgebung einfarbig ist (keine Kanten, kein Antialiasing)."""
+
+    for x in range(2, image.width() - 2, step):
+        for y in range(2, image.height() - 2, step):
+            color = image.pixel(x, y)
+            if all(image.pixel(x + dx, y + dy) == color for dx in range(-2, 3) for dy in range(-2, 3)):
+                yield x, y
+
+
+def test_fallback_to_painter(app):
+    field = rendered_field(app, use_opengl=True)
+    if opengl_is_available():
+        assert field.gl_background is not None
+        assert field.background.isHidden()
+    else:
+        assert field.gl_background is None
+        assert not field.background.isHidden()
+
+
+def test_opengl_renders_like_painter(app):
+    if not opengl_is_available():
+        pytest.skip('kein OpenGL Kontext (z.B. QT_QPA_PLATFORM=offscreen), siehe Docstring für Xvfb')
+
+    gl_field = rendered_field(app, use_opengl=True)
+    painter_field = rendered_field(app, use_opengl=False)
+    gl_field.zoom_in(0.5)
+    painter_field.zoom_in(0.5)
+    app.processEvents()
+
+    gl_image = gl_field.grab().toImage()
+    painter_image = painter_field.grab().toImage()
+    for x, y in comparable_pixels(painter_image):
+        assert gl_image.pixelColor(x, y) == painter_image.pixelColor(x, y), (x, y)
+
+
+def test_shaders_with_surfaceless_egl():
+    pytest.importorskip('OpenGL')
+    env = dict(os.environ, PYOPENGL_PLATFORM='egl', LIBGL_ALWAYS_SOFTWARE='1', QT_QPA_PLATFORM='offscreen',
+               PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    result = subprocess.run([sys.executable, os.path.abspath(__file__)], env=env, cwd=ROOT,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode == EGL_UNAVAILABLE:
+        pytest.skip(result.stdout.strip())
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def make_egl_context() -> bool:
+    """Surfaceless EGL Kontext von Mesa ohne Fenster und ohne Display, True wenn er aktiv ist."""
+
+    import ctypes
+    from OpenGL import EGL
+
+    egl_platform_surfaceless_mesa = 0x31DD
+    address = EGL.eglGetProcAddress('eglGetPlatformDisplayEXT')
+    if not address:
+        return False
+    get_platform_display = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_uint, ctypes.c_void_p, ctypes.c_void_p)(address)
+    display = ctypes.cast(get_platform_display(egl_platform_surfaceless_mesa, None, None), EGL.EGLDisplay)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    if not display or not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+        return False
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context = EGL.eglCreateContext(display, EGL.EGLConfig(), EGL.EGL_NO_CONTEXT, None)
+    if context == EGL.EGL_NO_CONTEXT:
+        return False
+    return bool(EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, context))
+
+
+def render_with_shaders(field: GraphicField, width: int, height: int) -> QImage:
+    """Zeichnet wie _GLBackground.paintGL, aber mit PyOpenGL in ein Framebuffer Object."""
+
+    from array import array
+    from OpenGL import GL
+    from OpenGL.GL import shaders
+    from graphic_ext.gl_backend import VERTEX_SHADER, FRAGMENT_SHADER, UNIT_QUAD, view_uniform, background_rects
+
+    framebuffer = GL.glGenFramebuffers(1)
+    GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, framebuffer)
+    renderbuffer = GL.glGenRenderbuffers(1)
+    GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, renderbuffer)
+    GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_RGBA8, width, height)
+    GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0, GL.GL_RENDERBUFFER, renderbuffer)
+    GL.glViewport(0, 0, width, height)
+
+    program = shaders.compileProgram(shaders.compileShader(VERTEX_SHADER, GL.GL_VERTEX_SHADER),
+                                     shaders.compileShader(FRAGMENT_SHADER, GL.GL_FRAGMENT_SHADER))
+    GL.glUseProgram(program)
+    quad = GL.glGenBuffers(1)
+    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, quad)
+    data = array('f', UNIT_QUAD).tobytes()
+    GL.glBufferData(GL.GL_ARRAY_BUFFER, len(data), data, GL.GL_STATIC_DRAW)
+    position = GL.glGetAttribLocation(program, 'a_position')
+    GL.glEnableVertexAttribArray(position)
+    GL.glVertexAttribPointer(position, 2, GL.GL_FLOAT, GL.GL_FALSE, 0, None)
+
+    # Textur wie QOpenGLTexture(QImage): RGBA8888, erste Zeile des Bildes zuerst
+    image = field.scene.background_pixmap.toImage().convertToFormat(QImage.Format.Format_RGBA8888)
+    texture = GL.glGenTextures(1)
+    GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
+    GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 4)
+    GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA8, image.width(), image.height(), 0, GL.GL_RGBA,
+                    GL.GL_UNSIGNED_BYTE, image.constBits().asstring(image.sizeInBytes()))
+    GL.glUniform1i(GL.glGetUniformLocation(program, 'u_texture'), 0)
+
+    gray = QColor(Qt.GlobalColor.gray)
+    GL.glClearColor(gray.redF(), gray.greenF(), gray.blueF(), 1.)
+    GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+    GL.glUniform4f(GL.glGetUniformLocation(program, 'u_view'), *view_uniform(field, width, height))
+    for rect, color in background_rects(field):
+        GL.glUniform4f(GL.glGetUniformLocation(program, 'u_rect'), *rect)
+        if color is None:
+            GL.glUniform1f(GL.glGetUniformLocation(program, 'u_use_texture'), 1.)
+        else:
+            GL.glUniform1f(GL.glGetUniformLocation(program, 'u_use_texture'), 0.)
+            GL.glUniform4f(GL.glGetUniformLocation(program, 'u_color'),
+                           color.redF(), color.greenF(), color.blueF(), color.alphaF())
+        GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, 0, 4)
+    GL.glFinish()
+
+    pixels = GL.glReadPixels(0, 0, width, height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE)
+    # OpenGL zählt die Zeilen von unten
+    return QImage(pixels, width, height, 4 * width, QImage.Format.Format_RGBA8888).mirrored(False, True).copy()
+
+
+def main() -> int:
+
+    app = QApplication.instance() or QApplication([])
+    try:
+        egl_ok = make_egl_context()
+    except Exception as error:  # z.B. PyOpenGL ohne EGL oder kein Mesa
+        egl_ok = False
+        print(error)
+    if not egl_ok:
+        print('kein surfaceless EGL Kontext')
+        return EGL_UNAVAILABLE
+
+    field = rendered_field(app, use_opengl=False)
+    errors = []
+    # der letzte Zustand zeigt neben der Probe auch den grauen Bereich
+    for state in [(0, 0, 100), (25, 25, 50), (40, 40, 20), (-60, 30, 120)]:
+        field.set_zoom(*state)
+        app.processEvents()
+        painter_image = field.grab().toImage()
+        gl_image = render_with_shaders(field, painter_image.width(), painter_image.height())
+        pixels = list(comparable_pixels(painter_image))
+        colors = {painter_image.pixel(x, y) for x, y in pixels}
+        if len(colors) < 3 or (state[0] < 0 and QColor(Qt.GlobalColor.gray).rgb() not in colors):
+            errors.append(f'zu wenige Farben im Vergleich: {len(colors)}')
+        for x, y in pixels:
+            if gl_image.pixelColor(x, y) != painter_image.pixelColor(x, y):
+                errors.append(f'zoom {state}: ({x}, {y}) {gl_image.pixelColor(x, y).name()} '
+                              f'!= {painter_image.pixelColor(x, y).name()}')
+    print('\n'.join(errors[:20]) or 'ok')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
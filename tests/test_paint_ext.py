@@ -0,0 +1,37 @@
+from PyQt6.QtGui import QImage, QColor, QFont
+
+from graphic_ext import paint_ext
+from graphic_ext.paint_ext import QPainter_ext, static_text
+
+
+def test_static_text_cache(app):
+    paint_ext.clear_text_cache()
+    image = QImage(10, 10, QImage.Format.Format_ARGB32)
+    painter = QPainter_ext(image)
+    font = painter.font()
+    painter.end()
+
+    bold_font = QFont(font)
+    bold_font.setBold(True)
+    assert static_text('X', font) is static_text('X', font)
+    assert static_text('X', bold_font) is not static_text('X', font)
+    assert len(paint_ext._TEXT_CACHE) == 2
+
+
+def test_text_is_centered(app):
+    image = QImage(200, 100, QImage.Format.Format_ARGB32)
+    image.fill(QColor('white'))
+    painter = QPainter_ext()
+    painter.begin(image)
+    font = painter.font()
+    font.setPointSize(20)
+    painter.setFont(font)
+    painter.drawText_centered((100, 50), 'HH')
+    painter.end()
+
+    ink = [(x, y) for x in range(200) for y in range(100) if image.pixelColor(x, y).red() < 128]
+    xs = [x for x, _ in ink]
+    ys = [y for _, y in ink]
+    assert abs((min(xs) + max(xs)) / 2 - 100) <= 2
+    # 'H' hat keine Unterlänge, die Mitte der Zeile liegt darunter
+    assert 35 <= (min(ys) + max(ys)) / 2 <= 55
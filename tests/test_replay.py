@@ -0,0 +1,29 @@
+import pytest
+
+from graphic_ext.replay import (build_scene, hover_script, grab_pan_script, replay,
+                                InteractionRecorder, BudgetExceeded)
+
+
+@pytest.fixture(scope='module')
+def field(app):
+    return build_scene(n_objects=10, n_zones=5, background_size=(200, 200), field_size=(300, 300))
+
+
+def test_replay_reports_every_step(field):
+    script = hover_script((300, 300), steps=20) + grab_pan_script((300, 300), steps=10)
+    report = replay(field, script)
+
+    assert len(report.event_latencies['move']) == 30
+    assert len(report.frame_times) == len(script)
+    report.check_budgets(event_budget=1000, frame_budget=1000)
+    with pytest.raises(BudgetExceeded):
+        report.check_budgets(frame_budget=0)
+
+
+def test_recorded_script_replays(field):
+    recorder = InteractionRecorder(field)
+    replay(field, [('press', 10, 10), ('move', 20, 20), ('release', 20, 20)], measure_frames=False)
+    script = recorder.stop()
+
+    assert script == [('press', 10, 10), ('move', 20, 20), ('release', 20, 20)]
+    assert replay(field, script).event_latencies.keys() == {'press', 'move', 'release'}
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from PyQt6.QtGui import QPixmap, QColor
+
+from graphic_ext.gr_field import GraphicField, GraphicObject, GraphicZone
+
+np = pytest.importorskip('numpy')
+
+
+def make_field():
+    field = GraphicField()
+    background = QPixmap(300, 200)
+    background.fill(QColor('red'))
+    field.set_background(background)
+    return field
+
+
+def test_save_load_save_round_trip(app, tmp_path):
+    field = make_field()
+    masks = [np.zeros((200, 300), dtype=bool), np.ones((10, 20), dtype=bool)]
+    masks[0][10:50, 20:80] = True
+    field.zones.append(GraphicZone(field, mask=masks[0], metadata={'name': 'a'}))
+    field.zones.append(GraphicZone(field, mask=masks[1], mask_rect=(10, 10, 20, 10)))
+    field.zones.append(GraphicZone(field))  # check_func Zonen werden nicht gespeichert
+    GraphicObject(field, 5, 6)
+    field.zoom_in()
+    field.save_scene(str(tmp_path), {'sample': 1})
+
+    # in den gleichen Ordner speichern, aus dem gemappt geladen wurde
+    loaded = make_field()
+    loaded_object = GraphicObject(loaded)
+    zones = loaded.load_scene(str(tmp_path))
+    assert isinstance(zones[0].mask, np.memmap)
+    loaded.zones[0].mask = loaded.zones[0].mask[::-1].copy()  # geänderte Maske muss neu geschrieben werden
+    loaded.save_scene(str(tmp_path))
+
+    again = GraphicField()
+    zones = again.load_scene(str(tmp_path))
+    assert len(zones) == 2
+    np.testing.assert_array_equal(zones[0].mask, masks[0][::-1])
+    np.testing.assert_array_equal(zones[1].mask, masks[1])
+    assert zones[0].metadata == {'name': 'a'}
+    assert zones[1].mask_rect == (10, 10, 20, 10)
+    assert (again.x_range, again.y_range) == (300, 200)
+    assert again.zoom_state() == field.zoom_state()
+    assert (loaded_object.x, loaded_object.y) == (5, 6)
+    assert not any(name.endswith('.tmp') or name.endswith('.tmp.npy') for name in os.listdir(tmp_path))
+
+
+def test_save_twice_into_mapped_directory(app, tmp_path):
+    field = GraphicField(x_range=10, y_range=10)
+    a, b, x = (np.zeros((10, 10), dtype=bool) for _ in range(3))
+    a[0, 0] = b[5, 5] = x[9, 9] = True
+    field.zones.extend([GraphicZone(field, mask=a), GraphicZone(field, mask=b)])
+    field.save_scene(str(tmp_path))
+
+    loaded = GraphicField()
+    zone_a, zone_b = loaded.load_scene(str(tmp_path))
+    # zone_1.npy wird durch X ersetzt, B liegt danach in zone_2.npy, ist aber noch die alte zone_1.npy gemappt
+    loaded.zones.insert(1, GraphicZone(loaded, mask=x))
+    loaded.save_scene(str(tmp_path))
+    del loaded.zones[1]
+    loaded.save_scene(str(tmp_path))
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith('.npy')) == ['zone_0.npy', 'zone_1.npy']
+
+    # ein View des memmaps ist eine andere Maske
+    loaded.zones[0].mask = zone_a.mask[::-1]
+    loaded.save_scene(str(tmp_path))
+
+    again = GraphicField()
+    zones = again.load_scene(str(tmp_path), mmap=False)
+    np.testing.assert_array_equal(zones[0].mask, a[::-1])
+    np.testing.assert_array_equal(zones[1].mask, b)
+
+
+def test_load_sets_ranges_once(app, tmp_path):
+    field = GraphicField(x_range=30, y_range=20)
+    field.save_scene(str(tmp_path))
+
+    loaded = GraphicField()
+    emitted = []
+    loaded.scene.ranges_changed.connect(lambda: emitted.append((loaded.x_range, loaded.y_range)))
+    loaded.load_scene(str(tmp_path))
+    assert emitted == [(30, 20)]
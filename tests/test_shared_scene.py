@@ -0,0 +1,82 @@
+import pytest
+from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtGui import QPixmap, QColor
+from PyQt6.QtTest import QTest
+
+from graphic_ext.gr_field import GraphicField, GraphicZone, ViewportIndicator, ZoomState
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def views(app):
+    overview = GraphicField()
+    detail = GraphicField(scene=overview.scene)
+    background = QPixmap(400, 400)
+    background.fill(QColor('red'))
+    overview.set_background(background)
+    overview.resize(200, 200)
+    detail.resize(400, 400)
+    overview.show()
+    detail.show()
+    app.processEvents()
+    return overview, detail
+
+
+def test_background_and_ranges_are_shared(views):
+    overview, detail = views
+    assert detail.background.pixmap().cacheKey() == overview.background.pixmap().cacheKey()
+    assert detail.zoom_state() == ZoomState(0, 0, 400)
+
+    detail.zoom_in()
+    overview.x_range = 800
+    assert detail.x_range == 800
+    assert detail.zoom_state() == ZoomState(0, 0, 800)  # alle Ansichten werden benachrichtigt
+    assert detail.zoom_history.states == [ZoomState(0, 0, 800)]
+
+
+def test_hover_state_is_per_view(app, views):
+    overview, detail = views
+    mask = np.zeros((400, 400), dtype=bool)
+    mask[:200, :200] = True
+    zone = GraphicZone(overview, mask=mask)
+    overview.zones.append(zone)
+    events = []
+    zone.mouse_enter.connect(lambda: events.append('enter'))
+    zone.mouse_leave.connect(lambda: events.append('leave'))
+    detail_events = []
+    detail.zone_entered.connect(lambda z: detail_events.append(('entered', z)))
+    detail.zone_left.connect(lambda z: detail_events.append(('left', z)))
+
+    overview.update_hovered_zones(50, 50)
+    detail.update_hovered_zones(300, 300)  # in der Detailansicht nicht über der Zone
+    assert events == ['enter']
+    assert zone.activated
+    assert detail_events == []
+
+    detail.update_hovered_zones(50, 50)
+    overview.clear_hovered_zones()
+    assert events == ['enter']  # die Zone ist in der Detailansicht noch aktiv
+    detail.update_hovered_zones(300, 300)
+    assert events == ['enter', 'leave']
+    assert detail_events == [('entered', zone), ('left', zone)]
+    assert not zone.activated
+
+
+def test_viewport_indicator_follows_and_pans(app, views):
+    overview, detail = views
+    indicator = ViewportIndicator(overview, detail)
+    detail.zoom_in(0.5)
+    app.processEvents()
+    # sichtbarer Bereich der Detailansicht (100..300) in der Übersicht (0.5 Pixel pro Einheit)
+    assert indicator.geometry().getRect() == (50, 50, 100, 100)
+
+    QTest.mousePress(overview.front_layer, Qt.MouseButton.LeftButton, pos=QPoint(100, 100))
+    QTest.mouseMove(overview.front_layer, QPoint(120, 100))
+    QTest.mouseRelease(overview.front_layer, Qt.MouseButton.LeftButton, pos=QPoint(120, 100))
+    app.processEvents()
+
+    assert detail.zoom_state() == ZoomState(140, 100, 200)
+    assert indicator.geometry().getRect() == (70, 50, 100, 100)
+    assert detail.zoom_back()
+    assert detail.zoom_state() == ZoomState(100, 100, 200)
@@ -0,0 +1,122 @@
+import pytest
+from PyQt6.QtGui import QColor, QImage, QPainter
+
+from graphic_ext.gr_field import GraphicField, GraphicZone
+
+np = pytest.importorskip('numpy')
+
+
+class RecordingPainter(QPainter):
+    """Merkt sich die Größe der Bilder, die paint_mask zeichnet."""
+
+    def __init__(self, device):
+        super().__init__(device)
+        self.image_sizes = []
+
+    def drawImage(self, *args):
+        self.image_sizes.append((args[1].width(), args[1].height()))
+        super().drawImage(*args)
+
+
+def test_mask_rect_mapping(app):
+    # 20 x 10 Pixel über x 10..50, y 20..30: 0.5 Pixel pro Einheit in x, 1 Pixel pro Einheit in y
+    field = GraphicField(x_range=100, y_range=100)
+    mask = np.zeros((10, 20), dtype=bool)
+    mask[3, 5] = True
+    zone = GraphicZone(field, mask=mask, mask_rect=(10, 20, 40, 10))
+
+    assert zone.mask_transform() == (10, 20, 0.5, 1)
+    assert zone.mask_transform(1) == (10, 20, 0.25, 0.5)
+    xs = [20, 21.9, 19.9, 22, 21, 21, 9, 55]
+    ys = [23, 23.9, 23.5, 23.5, 22.9, 24, 20, 25]
+    expected = [True, True, False, False, False, False, False, False]
+    assert [zone.coordinates_are_in_zone(x, y) for x, y in zip(xs, ys)] == expected
+    np.testing.assert_array_equal(zone.contains_many(xs, ys), expected)
+
+
+def test_pyramid_is_max_pooled(app):
+    field = GraphicField(x_range=7, y_range=5)
+    mask = np.random.default_rng(1).random((5, 7)) > 0.8
+    zone = GraphicZone(field, mask=mask)
+
+    assert zone.mask_level(0) is zone.mask
+    assert [zone.mask_level(level).shape for level in range(1, 4)] == [(3, 4), (2, 2), (1, 1)]
+    level_1 = zone.mask_level(1)
+    for y in range(3):
+        for x in range(4):
+            assert level_1[y, x] == mask[2*y:2*y + 2, 2*x:2*x + 2].any()
+    assert zone.mask_level(3)[0, 0] == mask.any()
+
+    # eine gröbere Stufe findet jeden Punkt der feineren
+    xs, ys = np.meshgrid(np.arange(0.5, 7), np.arange(0.5, 5))
+    fine = zone.contains_many(xs, ys)
+    assert (zone.contains_many(xs, ys, level=1) >= fine).all()
+
+    # neue Maske verwirft die Pyramide
+    zone.mask = np.ones((5, 7), dtype=bool)
+    assert zone.mask_level(3)[0, 0]
+
+
+def test_level_for_pixel_scale(app):
+    field = GraphicField(x_range=100, y_range=100)
+    zone = GraphicZone(field, mask=np.zeros((400, 400), dtype=bool))  # 4 Pixel pro Einheit
+
+    assert zone.level_for_pixel_scale(8) == 0
+    assert zone.level_for_pixel_scale(4) == 0
+    assert zone.level_for_pixel_scale(2) == 1
+    assert zone.level_for_pixel_scale(1.9) == 1
+    assert zone.level_for_pixel_scale(1) == 2
+    assert zone.level_for_pixel_scale(1e-6) == 9  # nicht gröber als ein Pixel
+    assert zone.level_for_pixel_scale(0) == 0
+
+
+def test_paint_mask_in_second_view(app):
+    overview = GraphicField(x_range=100, y_range=100)
+    detail = GraphicField(scene=overview.scene)
+    for view in (overview, detail):
+        view.resize(200, 200)
+        view.show()
+    app.processEvents()
+
+    mask = np.zeros((400, 400), dtype=bool)
+    mask[160:200, 200:240] = True  # x 50..60, y 40..50
+    zone = GraphicZone(overview, mask=mask)
+    overview.zones.append(zone)
+    detail.set_zoom(45, 35, 20)
+
+    image = QImage(detail.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(0)
+    painter = RecordingPainter(image)
+    zone.paint_mask(painter, QColor('red'), detail)
+    painter.end()
+
+    assert image.pixelColor(*detail.norm_to_pixel_coord_int(55, 45)) == QColor('red')
+    assert image.pixelColor(*detail.norm_to_pixel_coord_int(47, 45)).alpha() == 0
+    assert image.pixelColor(*detail.norm_to_pixel_coord_int(55, 38)).alpha() == 0
+
+    # nur der sichtbare Ausschnitt wird in ein Bild umgewandelt
+    level = zone.level_for_pixel_scale(detail.norm_to_pixel_rel(1))
+    n_y, n_x = zone.mask_level(level).shape
+    [(width, height)] = painter.image_sizes
+    assert width < n_x and height < n_y
+
+
+def test_paint_mask_outside_view_and_cache(app):
+    field = GraphicField(x_range=100, y_range=100)
+    field.resize(200, 200)
+    mask = np.zeros((400, 400), dtype=bool)
+    mask[200:, 200:] = True
+    zone = GraphicZone(field, mask=mask)
+
+    image = QImage(field.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    painter = RecordingPainter(image)
+    field.set_zoom(-40, -40, 10)
+    zone.paint_mask(painter, QColor('red'))
+    assert painter.image_sizes == []
+
+    for i in range(10):
+        field.set_zoom(5 * i, 5 * i, 30)
+        zone.paint_mask(painter, QColor('red'))
+    painter.end()
+    assert len(painter.image_sizes) == 10
+    assert len(zone._GraphicZone__images) <= GraphicZone.mask_image_cache_size
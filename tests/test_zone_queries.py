@@ -0,0 +1,110 @@
+import pytest
+from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtTest import QTest
+
+from graphic_ext.gr_field import GraphicField, GraphicZone
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def field(app):
+    # 2 Maskenpixel pro normierte Einheit, Zone bedeckt x 20..40, y 10..30 (400 Einheiten²)
+    field = GraphicField(x_range=100, y_range=100)
+    mask = np.zeros((200, 200), dtype=bool)
+    mask[20:60, 40:80] = True
+    field.zones.append(GraphicZone(field, mask=mask))
+    field.zones.append(GraphicZone(field, mask=np.zeros((200, 200), dtype=bool)))
+    field.zones.append(GraphicZone(field))
+    return field
+
+
+def test_pixel_count_in_rect(field):
+    zone = field.zones[0]
+    assert zone.pixel_count_in_rect(0, 0, 100, 100) == 40 * 40
+    assert zone.pixel_count_in_rect(20, 10, 10, 10) == 20 * 20
+    assert zone.pixel_count_in_rect(35, 25, 100, 100) == 10 * 10
+    assert zone.pixel_count_in_rect(0, 0, 10, 10) == 0
+    assert zone.pixel_count_in_rect(-50, -50, 300, 300) == 40 * 40
+    # das Integralbild deckt nur die Bounding Box ab
+    assert zone.summed_area_table().shape == (41, 41)
+    assert field.zones[1].pixel_count_in_rect(0, 0, 100, 100) == 0
+
+
+def test_overlap_fractions(field):
+    overlaps = field.zones_in_rect(20, 10, 20, 40)
+    assert len(overlaps) == 1
+    overlap = overlaps[0]
+    assert overlap.zone is field.zones[0]
+    assert overlap.area == pytest.approx(400)
+    assert overlap.rect_fraction == pytest.approx(0.5)
+    assert overlap.zone_fraction == pytest.approx(1)
+
+    overlap = field.zones_in_rect(30, 10, 50, 10)[0]
+    assert overlap.area == pytest.approx(100)
+    assert overlap.zone_fraction == pytest.approx(0.25)
+    assert field.zones_in_rect(60, 60, 10, 10) == []
+
+
+def test_region_select(app, field):
+    field.resize(200, 200)
+    field.show()
+    app.processEvents()
+    field.set_mode('region_select')
+    selected = []
+    field.region_selected.connect(selected.append)
+
+    QTest.mousePress(field.front_layer, Qt.MouseButton.LeftButton, pos=QPoint(100, 80))
+    QTest.mouseMove(field.front_layer, QPoint(60, 2))
+    QTest.mouseRelease(field.front_layer, Qt.MouseButton.LeftButton, pos=QPoint(60, 2))
+
+    assert len(selected) == 1
+    assert [overlap.zone for overlap in selected[0]] == [field.zones[0]]
+    assert selected[0][0].area == pytest.approx(10 * 20)  # Rechteck 30..50 x 1..40
+    assert field.zoom_state() == (0, 0, 100)  # kein Zoom im Mode 'region_select'
+
+
+def test_contains_many_matches_single_queries(field):
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(-20, 120, 2000)
+    ys = rng.uniform(-20, 120, 2000)
+    for zone in field.zones:
+        expected = [zone.coordinates_are_in_zone(x, y) for x, y in zip(xs, ys)]
+        np.testing.assert_array_equal(zone.contains_many(xs, ys), expected)
+
+
+def test_contains_many_out_of_range(field):
+    zone = field.zones[0]
+    # negative Koordinaten dürfen nicht auf die andere Seite der Maske springen
+    zone.mask[-1, -1] = True
+    assert not zone.contains_many([-0.1, 100.2, 50], [-0.1, 100.2, 500]).any()
+    assert zone.contains_many([99.9], [99.9])[0]
+
+
+def test_check_func_calls(field):
+    calls = []
+
+    def vectorized(xs, ys):
+        calls.append(len(xs))
+        return xs > 50
+
+    def scalar(x, y):
+        calls.append(1)
+        return x > 50
+
+    vectorized_zone = GraphicZone(field, check_func=vectorized, check_func_vectorized=True)
+    np.testing.assert_array_equal(vectorized_zone.contains_many([10, 60, 70], [0, 0, 0]), [False, True, True])
+    assert calls == [3]
+
+    calls.clear()
+    scalar_zone = GraphicZone(field, check_func=scalar)
+    np.testing.assert_array_equal(scalar_zone.contains_many([10, 60, 70], [0, 0, 0]), [False, True, True])
+    assert calls == [1, 1, 1]
+
+
+def test_zones_at(field):
+    matrix = field.zones_at([25, 60, -5], [15, 60, 15])
+    assert matrix.shape == (3, 3)
+    np.testing.assert_array_equal(matrix[:, 0], [True, False, False])
+    assert not matrix[:, 1:].any()
+    assert field.zone_indices_at([25, 60], [15, 60]) == [[0], []]
@@ -0,0 +1,63 @@
+from PyQt6.QtCore import QSize
+from PyQt6.QtGui import QPixmap
+
+from graphic_ext.gr_field import GraphicField, ZoomHistory, ZoomState
+
+
+def test_back_forward_and_truncation():
+    history = ZoomHistory(max_length=3)
+    for i in range(3):
+        history.push(ZoomState(i, i, 10))
+    history.push(ZoomState(2, 2, 10))  # gleicher Zustand wird nicht doppelt gespeichert
+
+    assert history.back() == ZoomState(1, 1, 10)
+    assert history.back() == ZoomState(0, 0, 10)
+    assert history.back() is None
+    assert history.forward() == ZoomState(1, 1, 10)
+
+    history.push(ZoomState(5, 5, 10))  # verwirft die Vorwärts-Einträge
+    assert not history.can_go_forward()
+    assert history.states == [ZoomState(0, 0, 10), ZoomState(1, 1, 10), ZoomState(5, 5, 10)]
+
+    history.push(ZoomState(6, 6, 10))  # max_length
+    assert history.states[0] == ZoomState(1, 1, 10)
+    assert history.current() == ZoomState(6, 6, 10)
+
+
+def test_frame_cache_is_byte_bounded_lru(app):
+    frame = QPixmap(10, 10)
+    frame_bytes = 10 * 10 * max(frame.depth(), 8) // 8
+    history = ZoomHistory(max_cache_bytes=2 * frame_bytes)
+    size = QSize(10, 10)
+    a, b, c = ZoomState(0, 0, 1), ZoomState(1, 1, 1), ZoomState(2, 2, 1)
+
+    history.store_frame(a, size, frame)
+    history.store_frame(b, size, frame)
+    assert history.frame(a, size) is not None  # a ist jetzt der zuletzt benutzte Eintrag
+    history.store_frame(c, size, frame)
+
+    assert history.frame(b, size) is None
+    assert history.frame(a, size) is not None
+    assert history.frame(c, size) is not None
+    assert history.frame(c, QSize(20, 20)) is None
+    assert history.cache_bytes() == 2 * frame_bytes
+
+
+def test_zoom_does_not_grab_and_history_starts_at_background(app):
+    field = GraphicField()
+    field.set_background(QPixmap(200, 100))
+    field.resize(200, 100)
+    field.show()
+    app.processEvents()
+
+    field.zoom_in()
+    field.zoom_in()
+    assert field.zoom_history.cache_bytes() == 0
+    assert field.zoom_history.states[0] == ZoomState(0, 0, 200)
+
+    assert field.zoom_back()
+    assert field.zoom_history.cache_bytes() > 0  # der verlassene Zustand wird gespeichert
+    assert field.zoom_forward()
+    assert field.showing_cached_frame()
+    field.zoom_reset()
+    assert not field.showing_cached_frame()